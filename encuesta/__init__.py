@@ -0,0 +1,40 @@
+""" Metricas e informes PDF de la encuesta.
+
+    Librerias utilizadas:
+
+    matplotlib==3.9.0
+    mysql-connector-python==9.0.0
+    fpdf==1.7.2
+    PyPDF2==3.0.1
+    pandas==2.2.2
+
+    Los submodulos se importan recien al usar sus nombres (from encuesta import crear_graficos
+    carga matplotlib, import encuesta no carga nada pesado).
+"""
+import importlib
+
+_EXPORTADOS = {
+    'instrumentacion': ('configurar_logging', 'instrumentacion', 'logger'),
+    'conexion': ('cargar_config', 'connectDB', 'obtener_pool', 'ErrorConexion'),
+    'datos': ('fetch_data', 'fetch_data_chunks', 'lotes'),
+    'snapshots': ('CacheSnapshots', 'obtener_dataset'),
+    'metricas': ('MetricasEncuesta', 'calcular_metricas', 'calcular_metricas_incremental', 'BACKENDS_METRICAS'),
+    'segmentos': ('agrupar_segmentos', 'BACKENDS_SEGMENTOS'),
+    'graficos': ('crear_graficos', 'crear_grafico_segmentos', 'figura_a_png'),
+    'informes': ('create_pdf', 'generar_informe_completo', 'generar_informe_metricas', 'merge_pdfs'),
+    'clasificacion': ('clasificar_comentarios', 'leer_comentarios', 'CLASIFICADORES'),
+    'problemas': ('IndiceProblemas', 'agregar_problemas'),
+    'lote': ('generar_informes_lote',),
+    'sinteticos': ('crear_encuesta_sintetica', 'generar_encuesta', 'benchmark_pipeline'),
+    'pipeline': ('calcular', 'obtener_comentarios'),
+    'distribuciones': ('TDigest', 'resumen_histograma'),
+    'servicio': ('ServicioEncuesta', 'servir'),
+}
+_MODULO_DE = {nombre: modulo for modulo, nombres in _EXPORTADOS.items() for nombre in nombres}
+
+__all__ = sorted(_MODULO_DE)
+
+def __getattr__(nombre):
+    if nombre not in _MODULO_DE:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    return getattr(importlib.import_module(f".{_MODULO_DE[nombre]}", __name__), nombre)
@@ -0,0 +1,219 @@
+""" Clasificacion de las respuestas abiertas (recomendacion_abierta) """
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+import urllib.request
+
+from .datos import CHUNK_SIZE, COLUMNA_ID, TABLA, es_nulo, fetch_data_chunks
+from .instrumentacion import logger
+
+# Lee los comentarios no vacios de la encuesta por lotes
+def leer_comentarios(cursor, filtro=None, params=(), tabla=TABLA, chunk_size=CHUNK_SIZE):
+    condicion = "recomendacion_abierta IS NOT NULL AND recomendacion_abierta <> ''"
+    filtro = f"({filtro}) AND {condicion}" if filtro else condicion
+    columnas = ['recomendacion', 'recomendacion_abierta'] + ([COLUMNA_ID] if COLUMNA_ID else [])
+    return extraer_comentarios(fetch_data_chunks(cursor, chunk_size, columnas, filtro, params, tabla=tabla))
+
+# Comentarios no vacios de un iterable de lotes (de la base o de un snapshot)
+def extraer_comentarios(chunks):
+    comentarios = []
+    for chunk in chunks:
+        texto = chunk['recomendacion_abierta']
+        chunk = chunk[texto.notna() & (texto != '')]
+        for fila in chunk.itertuples(index=False):
+            comentarios.append({
+                'id': getattr(fila, COLUMNA_ID) if COLUMNA_ID and COLUMNA_ID in chunk.columns else None,
+                'recomendacion': None if es_nulo(fila.recomendacion) else int(fila.recomendacion),
+                'comment': fila.recomendacion_abierta.strip(),
+            })
+    return comentarios
+
+# Texto en minusculas y sin tildes, para comparar palabras
+def normalizar_texto(texto):
+    texto = unicodedata.normalize('NFKD', texto.lower())
+    return ''.join(caracter for caracter in texto if not unicodedata.combining(caracter))
+
+# Clasificador local por lexico: cuenta raices positivas y negativas (una negacion hasta tres
+# palabras antes invierte la primera palabra con sentimiento que le sigue, "sin reclamos" suma)
+# y asigna problemas por palabras clave, que se buscan al comienzo de una palabra.
+# Todos los clasificadores exponen nombre y clasificar_lote(textos) -> [{'sentiment', 'problems'}]
+class ClasificadorLexico:
+    nombre = 'lexico-v2'
+
+    POSITIVAS = r'buen|bien|excelent|espectacular|agradec|recomiend|recomendari|transparent|expedit|rapid|amabl|satisfech|cumpl|feliz|conform|mejor(?:es)?$|suficient'
+    NEGATIVAS = r'mal[aoe]?s?\b|pesim|deficien|lent|demor|falla|error|problema|defect|engan|nul[ao]s?\b|fatal|horribl|car[oa]s?\b|costos|injustific|irresponsab|equivoc|engorros|falt|arbitrari|sucia|reclam|llovi|filtra|parche'
+    NEGACIONES = {'no', 'nunca', 'ni', 'tampoco', 'sin', 'poco'}
+    PROBLEMAS = [
+        ('Servicio de postventa', r'postventa|post venta|garantia|reparacion'),
+        ('Estacionamientos', r'estacionamiento'),
+        ('Calidad de construcción', r'terminacion|material|calidad|defectuos|construccion|instalad|ventana|enchufe|chapa'),
+        ('Administración y gastos comunes', r'administra|gastos comunes|cobro'),
+        ('Proceso de compra y financiamiento', r'subsidio|credito|banco|escritura|pago|firma'),
+        ('Atención al cliente', r'atencion|trato|vendedor|ejecutiv|personal|comunicacion'),
+        ('Demoras en respuestas', r'demor|lent|tiempo de respuesta|no respond|responder'),
+        ('Información engañosa', r'enganos|publicidad|transparencia|falsa|informacion errada|falta a la verdad'),
+    ]
+
+    def __init__(self):
+        self._palabra = re.compile(r'\w+')
+        self._positiva = re.compile(rf'^(?:{self.POSITIVAS})')
+        self._negativa = re.compile(rf'^(?:{self.NEGATIVAS})')
+        # Anclados al comienzo de palabra: 'lent' no debe encontrarse en "excelente" ni 'trato' en "contrato"
+        self._problemas = [(etiqueta, re.compile(rf'\b(?:{patron})')) for etiqueta, patron in self.PROBLEMAS]
+
+    def clasificar(self, texto):
+        texto = normalizar_texto(texto)
+        puntaje = 0
+        negacion = 0 # palabras restantes afectadas por la ultima negacion
+        for palabra in self._palabra.findall(texto):
+            if palabra in self.NEGACIONES:
+                negacion = 3
+                continue
+            signo = 1 if self._positiva.match(palabra) else -1 if self._negativa.match(palabra) else 0
+            if signo:
+                # La negacion se aplica a una sola palabra con sentimiento, sea positiva o negativa
+                if negacion:
+                    signo = -signo
+                negacion = 0
+            else:
+                negacion = max(negacion - 1, 0)
+            puntaje += signo
+        sentiment = 'Positivo' if puntaje > 0 else 'Negativo' if puntaje < 0 else 'Neutro'
+        problems = [] if sentiment == 'Positivo' else [etiqueta for etiqueta, patron in self._problemas if patron.search(texto)]
+        return {'sentiment': sentiment, 'problems': problems}
+
+    async def clasificar_lote(self, textos):
+        return [self.clasificar(texto) for texto in textos]
+
+# Clasificador con un LLM por HTTP (API compatible con chat completions de OpenAI).
+# La URL, el modelo y la clave se toman de ENCUESTA_LLM_URL, ENCUESTA_LLM_MODELO y ENCUESTA_LLM_API_KEY
+class ClasificadorLLM:
+    PROMPT = (
+        "Clasifica cada comentario de una encuesta inmobiliaria. Responde solo con JSON de la forma "
+        '{"resultados": [{"sentiment": "Positivo|Negativo|Neutro", "problems": ["..."]}]}, '
+        "un resultado por comentario y en el mismo orden."
+    )
+
+    def __init__(self, url=None, modelo=None, api_key=None, timeout=60):
+        self.url = url or os.environ.get('ENCUESTA_LLM_URL', 'https://api.openai.com/v1/chat/completions')
+        self.modelo = modelo or os.environ.get('ENCUESTA_LLM_MODELO', 'gpt-4o-mini')
+        self.api_key = api_key or os.environ.get('ENCUESTA_LLM_API_KEY')
+        self.timeout = timeout
+        self.nombre = f"llm-{self.modelo}"
+
+    def _pedir(self, textos):
+        numerados = '\n'.join(f"{indice}. {texto}" for indice, texto in enumerate(textos, start=1))
+        cuerpo = json.dumps({
+            'model': self.modelo,
+            'messages': [{'role': 'system', 'content': self.PROMPT}, {'role': 'user', 'content': numerados}],
+            'response_format': {'type': 'json_object'},
+        }).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        if self.api_key:
+            headers['Authorization'] = f"Bearer {self.api_key}"
+        request = urllib.request.Request(self.url, data=cuerpo, headers=headers, method='POST')
+        with urllib.request.urlopen(request, timeout=self.timeout) as respuesta:
+            contenido = json.load(respuesta)['choices'][0]['message']['content']
+        resultados = json.loads(contenido)['resultados']
+        if len(resultados) != len(textos):
+            raise ValueError(f"El LLM devolvió {len(resultados)} resultados para {len(textos)} comentarios")
+        return [{'sentiment': resultado['sentiment'], 'problems': list(resultado.get('problems', []))} for resultado in resultados]
+
+    async def clasificar_lote(self, textos):
+        return await asyncio.to_thread(self._pedir, textos)
+
+CLASIFICADORES = {
+    'lexico': ClasificadorLexico,
+    'llm': ClasificadorLLM,
+}
+
+# Limita la cantidad de lotes que se inician por segundo
+class LimitadorTasa:
+    def __init__(self, por_segundo):
+        self.intervalo = 1 / por_segundo if por_segundo else 0
+        self._proximo = 0.0
+        self._lock = asyncio.Lock()
+
+    async def esperar(self):
+        async with self._lock:
+            ahora = time.monotonic()
+            espera = self._proximo - ahora
+            self._proximo = max(ahora, self._proximo) + self.intervalo
+        if espera > 0:
+            await asyncio.sleep(espera)
+
+# Cache persistente de clasificaciones, por hash del texto y clasificador
+ARCHIVO_CACHE_CLASIFICACION = 'cache_clasificacion.sqlite'
+
+class CacheClasificacion:
+    def __init__(self, path=ARCHIVO_CACHE_CLASIFICACION):
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS clasificacion (hash TEXT PRIMARY KEY, resultado TEXT NOT NULL)")
+
+    @staticmethod
+    def clave(clasificador, texto):
+        return hashlib.sha256(f"{clasificador.nombre}\0{texto}".encode('utf-8')).hexdigest()
+
+    def obtener(self, claves):
+        encontrados = {}
+        claves = list(claves)
+        # SQLite limita la cantidad de parametros por consulta
+        for inicio in range(0, len(claves), 500):
+            parte = claves[inicio:inicio + 500]
+            marcas = ', '.join('?' * len(parte))
+            for clave, resultado in self._conn.execute(f"SELECT hash, resultado FROM clasificacion WHERE hash IN ({marcas})", parte):
+                encontrados[clave] = json.loads(resultado)
+        return encontrados
+
+    def guardar(self, resultados):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO clasificacion (hash, resultado) VALUES (?, ?)",
+            [(clave, json.dumps(resultado, ensure_ascii=False)) for clave, resultado in resultados.items()],
+        )
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+# Clasifica los comentarios: los que ya estan en la cache no se vuelven a enviar,
+# el resto se manda en lotes concurrentes respetando el limite de tasa
+async def clasificar_comentarios_async(comentarios, clasificador, cache, tamano_lote=20, concurrencia=4, por_segundo=None):
+    claves = [cache.clave(clasificador, comentario['comment']) for comentario in comentarios]
+    resultados = cache.obtener(set(claves))
+    pendientes = {}
+    for clave, comentario in zip(claves, comentarios):
+        if clave not in resultados:
+            pendientes.setdefault(clave, comentario['comment'])
+
+    pendientes = list(pendientes.items())
+    lotes = [pendientes[inicio:inicio + tamano_lote] for inicio in range(0, len(pendientes), tamano_lote)]
+    semaforo = asyncio.Semaphore(concurrencia)
+    limitador = LimitadorTasa(por_segundo)
+
+    async def procesar(lote):
+        async with semaforo:
+            await limitador.esperar()
+            clasificados = await clasificador.clasificar_lote([texto for _, texto in lote])
+        nuevos = {clave: clasificado for (clave, _), clasificado in zip(lote, clasificados)}
+        # Se guarda cada lote al terminar, asi un corte a mitad de camino no pierde lo ya pagado
+        cache.guardar(nuevos)
+        resultados.update(nuevos)
+
+    await asyncio.gather(*(procesar(lote) for lote in lotes))
+    return [dict(comentario, **resultados[clave]) for clave, comentario in zip(claves, comentarios)], len(pendientes)
+
+def clasificar_comentarios(comentarios, clasificador=None, cache_path=ARCHIVO_CACHE_CLASIFICACION, **kwargs):
+    clasificador = clasificador or ClasificadorLexico()
+    cache = CacheClasificacion(cache_path)
+    try:
+        clasificados, nuevos = asyncio.run(clasificar_comentarios_async(comentarios, clasificador, cache, **kwargs))
+    finally:
+        cache.close()
+    logger.info(f"Comentarios clasificados: {len(clasificados)} ({nuevos} nuevos, el resto desde la cache)",
+                extra={'datos': {'comentarios': len(clasificados), 'nuevos': nuevos}})
+    return clasificados
@@ -0,0 +1,260 @@
+""" Linea de comandos: python -m encuesta <subcomando> [opciones] """
+import argparse
+import json
+import os
+import sys
+
+from .datos import PERIODOS, filtro_ventana, ventana_fechas
+from .instrumentacion import configurar_logging, instrumentacion, logger
+
+# Cada subcomando importa solo lo que usa: "metrics --json" con --backend=sql
+# no carga pandas, matplotlib, fpdf ni PyPDF2
+SUBCOMANDOS = ('metrics', 'charts', 'comments-report', 'merge', 'all', 'lote', 'generar-encuesta', 'benchmark', 'servir')
+
+def _cache(args):
+    if not args.cache:
+        return None
+    from .snapshots import CacheSnapshots
+    return CacheSnapshots(args.cache_dir, args.cache_ttl, int(args.cache_max_mb * 2 ** 20))
+
+def _dimensiones(args):
+    return [dimension for dimension in (args.segmentos or '').split(',') if dimension]
+
+def _calcular(args, cache=None):
+    from .pipeline import calcular, registrar_consultas
+    salida = calcular(args.backend, _dimensiones(args), args.periodo, args.incremental, cache or _cache(args), args.refrescar_cache,
+                      ventana=args.ventana)
+    registrar_consultas()
+    return salida
+
+# Informe de ejecucion (--instrumentar) junto a la salida, o en el directorio actual
+def _guardar_informe_ejecucion(salida=None):
+    directorio = os.path.dirname(salida) if isinstance(salida, str) and salida != '-' else ''
+    path = os.path.join(directorio, 'informe_ejecucion.json')
+    from .conexion import estadisticas_consultas
+    instrumentacion.guardar_informe(path, estadisticas_consultas())
+    logger.info(f"Informe de ejecución guardado en '{path}'")
+
+def _resumen_pdf(pdf, salida):
+    return {'salida': salida, 'paginas': pdf.page_no(), 'bytes': os.path.getsize(salida) if salida != '-' else None}
+
+def comando_metrics(args):
+    resultado, segmentos, _ = _calcular(args)
+    if resultado is None:
+        return None
+    salida = {'metricas': resultado}
+    if segmentos is not None:
+        salida['segmentos'] = segmentos.to_dict('records')
+    if not args.json:
+        for clave, valor in resultado.items():
+            logger.info(f"{clave}: {valor}")
+    return salida
+
+def comando_charts(args):
+    resultado, segmentos, _ = _calcular(args)
+    if resultado is None:
+        return None
+    from .graficos import crear_grafico_segmentos, crear_graficos
+    crear_graficos(resultado, args.salida)
+    archivos = [args.salida]
+    if segmentos is not None and len(segmentos):
+        crear_grafico_segmentos(segmentos, _dimensiones(args), args.periodo, path=args.salida_segmentos)
+        archivos.append(args.salida_segmentos)
+    logger.info(f"Gráficos guardados en {', '.join(archivos)}")
+    return {'salida': archivos}
+
+def comando_comments_report(args):
+    from .informes import create_pdf
+    from .pipeline import cargar_dataset, obtener_comentarios
+    cache = _cache(args)
+    dataset = cargar_dataset(cache, refrescar=args.refrescar_cache, comentarios=True) if cache is not None else None
+    comments = obtener_comentarios(dataset, args.clasificador, ventana=args.ventana, ejemplo=args.ejemplo)
+    pdf = create_pdf(comments, args.salida, args.modo_comentarios)
+    return dict(_resumen_pdf(pdf, args.salida), comentarios=len(comments))
+
+def comando_merge(args):
+    from .informes import merge_pdfs
+    merge_pdfs(args.entradas, args.salida)
+    logger.info(f"PDF unidos en '{args.salida}'")
+    return {'salida': args.salida, 'entradas': args.entradas}
+
+# Informe completo en un solo documento (con --secciones se escriben ademas los PDF de cada seccion).
+# Con --salida=- el PDF va a stdout (los mensajes siempre van a stderr)
+def comando_all(args):
+    from .informes import create_pdf, generar_informe_completo, generar_informe_metricas
+    from .pipeline import cargar_dataset, obtener_comentarios
+    cache = _cache(args)
+    resultado, segmentos, dataset = _calcular(args, cache)
+    if resultado is not None and args.secciones:
+        generar_informe_metricas(resultado)
+        logger.info("Informe de métricas PDF creado exitosamente.")
+    # Si las metricas salieron del snapshot, los comentarios tambien (ahora si con el texto)
+    if dataset is not None:
+        dataset = cargar_dataset(cache, _dimensiones(args), comentarios=True)
+    comments = obtener_comentarios(dataset, args.clasificador, ventana=args.ventana, ejemplo=args.ejemplo)
+    if args.secciones:
+        create_pdf(comments, "Informe_gpt.pdf", args.modo_comentarios)
+    destino = sys.stdout.buffer if args.salida == '-' else args.salida
+    with instrumentacion.etapa('informe_completo'):
+        pdf = generar_informe_completo(resultado, comments, destino, args.modo_comentarios,
+                                 segmentos=segmentos, dimensiones=_dimensiones(args), periodo=args.periodo)
+    logger.info(f"Informe completo guardado en '{args.salida}'", extra={'datos': {'paginas': pdf.page_no()}})
+    return _resumen_pdf(pdf, args.salida)
+
+# Un informe por proyecto en paralelo: --lote=fuentes.json o --segmento=columna
+def comando_lote(args):
+    from .lote import fuentes_por_segmento, generar_informes_lote
+    if args.lote:
+        with open(args.lote, encoding='utf-8') as f:
+            fuentes = json.load(f)
+    else:
+        fuentes = fuentes_por_segmento(args.segmento)
+    if args.ventana:
+        for fuente in fuentes:
+            fuente['filtro'], fuente['params'] = filtro_ventana(args.ventana, fuente.get('filtro'), fuente.get('params', ()))
+    return generar_informes_lote(fuentes, args.directorio, args.backend, args.workers, args.incremental)
+
+def comando_generar_encuesta(args):
+    from .sinteticos import crear_encuesta_sintetica
+    filas = crear_encuesta_sintetica(args.filas, args.destino)
+    logger.info(f"Encuesta sintética generada: {filas} filas en '{args.destino}'")
+    return {'filas': filas, 'destino': args.destino}
+
+def comando_benchmark(args):
+    from .sinteticos import benchmark_create_pdf, benchmark_pipeline, comparar_benchmarks
+    if args.comentarios:
+        return {'comentarios': benchmark_create_pdf() + benchmark_create_pdf((1000,), 'completo')}
+    tamanos = [int(tamano) for tamano in args.tamanos.split(',')]
+    informe = benchmark_pipeline(tamanos, args.salida)
+    if args.comparar:
+        informe['regresiones'] = comparar_benchmarks(args.comparar, args.salida)
+    return informe
+
+# Servicio HTTP que queda levantado hasta Ctrl+C; al terminar devuelve sus estadisticas
+def comando_servir(args):
+    from .servicio import servir
+    return servir(args.host, args.puerto, args.max_resultados, args.ttl_resultados, args.intervalo_marca)
+
+def crear_parser():
+    comun = argparse.ArgumentParser(add_help=False)
+    comun.add_argument('--json', action='store_true', help="resultado en JSON por stdout")
+    comun.add_argument('--log-json', action='store_true', help="mensajes en JSON (una linea por evento) por stderr")
+    comun.add_argument('--instrumentar', action='store_true', default=os.environ.get('ENCUESTA_INSTRUMENTAR') == '1',
+                       help="guarda informe_ejecucion.json/.prom con tiempos y contadores por etapa")
+    comun.add_argument('--memoria', action='store_true', help="con --instrumentar, memoria pico por etapa")
+    comun.add_argument('--perfil', action='store_true', help="con --instrumentar, funciones mas costosas (cProfile)")
+
+    # Ventana de fechas: se aplica como rango sobre fecha en la consulta (o sobre el snapshot)
+    ventana = argparse.ArgumentParser(add_help=False)
+    ventana.add_argument('--desde', help="fecha inicial, ej. 2024-05-01 o '2024-05-01 08:00'")
+    ventana.add_argument('--hasta', help="fecha final (sin hora incluye ese dia completo)")
+    ventana.add_argument('--ultimos-dias', type=float, help="ventana movil: los ultimos N dias hasta ahora")
+
+    cache = argparse.ArgumentParser(add_help=False, parents=[ventana])
+    cache.add_argument('--cache', action='store_true', help="lee la tabla de un snapshot local")
+    cache.add_argument('--cache-dir', default='cache_snapshots')
+    cache.add_argument('--cache-ttl', type=float, default=3600, help="segundos de vigencia del snapshot")
+    cache.add_argument('--cache-max-mb', type=float, default=1024)
+    cache.add_argument('--refrescar-cache', action='store_true')
+
+    datos = argparse.ArgumentParser(add_help=False, parents=[cache])
+    datos.add_argument('--backend', choices=('pandas', 'sql'), default='pandas')
+    datos.add_argument('--incremental', action='store_true', help="solo lee las filas nuevas desde la ultima corrida")
+    datos.add_argument('--segmentos', help="dimensiones separadas por coma (ej. proyecto,canal)")
+    datos.add_argument('--periodo', choices=PERIODOS)
+
+    comentarios = argparse.ArgumentParser(add_help=False)
+    comentarios.add_argument('--clasificador', choices=('lexico', 'llm'), default='lexico')
+    comentarios.add_argument('--modo-comentarios', choices=('completo', 'resumen'))
+    comentarios.add_argument('--ejemplo', action='store_true', help="sin base de datos usa los comentarios de ejemplo")
+
+    parser = argparse.ArgumentParser(prog='encuesta', description="Métricas e informes de la encuesta")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    sub = subparsers.add_parser('metrics', parents=[comun, datos], help="calcula las metricas")
+    sub.set_defaults(funcion=comando_metrics)
+
+    sub = subparsers.add_parser('charts', parents=[comun, datos], help="guarda los graficos (.png, .svg o .pdf)")
+    sub.add_argument('--salida', default='graficos.png')
+    sub.add_argument('--salida-segmentos', default='graficos_segmentos.png')
+    sub.set_defaults(funcion=comando_charts)
+
+    sub = subparsers.add_parser('comments-report', parents=[comun, cache, comentarios], help="PDF de los comentarios")
+    sub.add_argument('--salida', default='Informe_gpt.pdf')
+    sub.set_defaults(funcion=comando_comments_report)
+
+    sub = subparsers.add_parser('merge', parents=[comun], help="une varios PDF en uno")
+    sub.add_argument('entradas', nargs='+')
+    sub.add_argument('--salida', default='Informe_completo.pdf')
+    sub.set_defaults(funcion=comando_merge)
+
+    sub = subparsers.add_parser('all', parents=[comun, datos, comentarios], help="informe completo (por defecto)")
+    sub.add_argument('--salida', default='Informe_completo.pdf', help="ruta del PDF, o - para stdout")
+    sub.add_argument('--secciones', action='store_true', help="escribe ademas el PDF de cada seccion")
+    sub.set_defaults(funcion=comando_all)
+
+    sub = subparsers.add_parser('lote', parents=[comun, ventana], help="un informe por proyecto en paralelo")
+    fuente = sub.add_mutually_exclusive_group(required=True)
+    fuente.add_argument('--lote', help="JSON con la lista de fuentes")
+    fuente.add_argument('--segmento', help="columna: un informe por cada valor")
+    sub.add_argument('--backend', choices=('pandas', 'sql'), default='pandas')
+    sub.add_argument('--incremental', action='store_true')
+    sub.add_argument('--workers', type=int)
+    sub.add_argument('--directorio', default='informes')
+    sub.set_defaults(funcion=comando_lote)
+
+    sub = subparsers.add_parser('generar-encuesta', parents=[comun], help="genera una encuesta sintetica")
+    sub.add_argument('filas', type=int)
+    sub.add_argument('--destino', default='encuesta.db', help="archivo .db/.sqlite, .csv, .parquet o mysql")
+    sub.set_defaults(funcion=comando_generar_encuesta)
+
+    sub = subparsers.add_parser('benchmark', parents=[comun], help="tiempos y memoria por etapa")
+    sub.add_argument('--tamanos', default='10000,1000000,10000000')
+    sub.add_argument('--salida', default='benchmark.json')
+    sub.add_argument('--comparar', help="benchmark anterior para marcar regresiones")
+    sub.add_argument('--comentarios', action='store_true', help="mide solo el PDF de comentarios")
+    sub.set_defaults(funcion=comando_benchmark)
+
+    sub = subparsers.add_parser('servir', parents=[comun], help="servicio HTTP local de metricas, graficos e informes")
+    sub.add_argument('--host', default='127.0.0.1')
+    sub.add_argument('--puerto', type=int, default=8000)
+    sub.add_argument('--max-resultados', type=int, default=128, help="respuestas guardadas en la cache (LRU)")
+    sub.add_argument('--ttl-resultados', type=float, default=300, help="segundos de vigencia de cada respuesta")
+    sub.add_argument('--intervalo-marca', type=float, default=2, help="segundos entre consultas de la marca de agua")
+    sub.set_defaults(funcion=comando_servir)
+    return parser
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    # Sin subcomando se arma el informe completo (como el script original)
+    if not argv or (argv[0] not in SUBCOMANDOS and argv[0] not in ('-h', '--help')):
+        argv.insert(0, 'all')
+    parser = crear_parser()
+    args = parser.parse_args(argv)
+    if args.json and getattr(args, 'salida', None) == '-':
+        parser.error("--json no se puede usar con --salida=- (los dos van a stdout)")
+    if hasattr(args, 'desde'):
+        try:
+            args.ventana = ventana_fechas(args.desde, args.hasta, args.ultimos_dias)
+        except ValueError as e:
+            parser.error(str(e))
+        if args.ventana and getattr(args, 'incremental', False):
+            parser.error("--incremental no se puede combinar con --desde/--hasta/--ultimos-dias")
+
+    configurar_logging(args.log_json)
+    if args.instrumentar:
+        instrumentacion.activar(args.memoria, args.perfil)
+    from .conexion import ErrorConexion
+    try:
+        salida = args.funcion(args)
+    except ErrorConexion as e:
+        logger.error(str(e))
+        return 1
+    if instrumentacion.activa:
+        _guardar_informe_ejecucion(getattr(args, 'salida', None))
+    if salida is None:
+        return 1
+    if args.json:
+        json.dump(salida, sys.stdout, ensure_ascii=False, default=str)
+        sys.stdout.write('\n')
+    return 0
@@ -0,0 +1,213 @@
+""" Configuracion y pool de conexiones a la base de datos (MySQL o SQLite) """
+import json
+import os
+import queue
+import random
+import sqlite3
+import sys
+import threading
+import time
+
+from .instrumentacion import instrumentacion, logger
+
+# La configuracion se toma de un archivo JSON (ENCUESTA_DB_CONFIG=ruta/al/archivo.json)
+# o de variables de entorno ENCUESTA_DB_*. Con ENCUESTA_DB_DRIVER=sqlite se usa una
+# base SQLite local (ENCUESTA_DB_DATABASE=ruta/al/archivo.db) en lugar de MySQL.
+CONFIG_DEFAULT = {
+    'driver': 'mysql',
+    'host': 'localhost',
+    'port': 3306,
+    'user': None,
+    'password': None,
+    'database': 'prueba_postulantes',
+    'pool_size': 5,
+    'connect_timeout': 10,
+    'reintentos': 3,
+    'backoff': 0.5,
+}
+
+def cargar_config(path=None):
+    config = dict(CONFIG_DEFAULT)
+    path = path or os.environ.get('ENCUESTA_DB_CONFIG')
+    if path:
+        with open(path, encoding='utf-8') as f:
+            config.update(json.load(f))
+    for clave, valor_default in CONFIG_DEFAULT.items():
+        valor = os.environ.get(f"ENCUESTA_DB_{clave.upper()}")
+        if valor is not None:
+            config[clave] = type(valor_default)(valor) if isinstance(valor_default, (int, float)) else valor
+    return config
+
+# Cursor que mide el tiempo de cada consulta (execute + lectura de filas)
+# y adapta los parametros %s al estilo de SQLite cuando hace falta
+class CursorMedido:
+    def __init__(self, cursor, pool):
+        self._cursor = cursor
+        self._pool = pool
+        self._query = None
+
+    @property
+    def driver(self):
+        return self._pool.driver
+
+    def execute(self, query, params=()):
+        self._query = query
+        if self._pool.driver == 'sqlite':
+            query = query.replace('%s', '?')
+        inicio = time.perf_counter()
+        try:
+            return self._cursor.execute(query, params)
+        finally:
+            self._pool.registrar_query(self._query, time.perf_counter() - inicio, 0)
+
+    def executemany(self, query, filas):
+        self._query = query
+        if self._pool.driver == 'sqlite':
+            query = query.replace('%s', '?')
+        inicio = time.perf_counter()
+        try:
+            return self._cursor.executemany(query, filas)
+        finally:
+            self._pool.registrar_query(self._query, time.perf_counter() - inicio, len(filas))
+
+    def _leer(self, metodo, *args):
+        inicio = time.perf_counter()
+        filas = getattr(self._cursor, metodo)(*args)
+        cantidad = 1 if metodo == 'fetchone' and filas is not None else len(filas or ())
+        self._pool.registrar_query(self._query, time.perf_counter() - inicio, cantidad, llamada=False)
+        if instrumentacion.activa and cantidad:
+            # Aproximacion de los bytes recibidos: tamaño de los valores de cada fila
+            lote = [filas] if metodo == 'fetchone' else filas
+            instrumentacion.contar('filas_leidas', cantidad)
+            instrumentacion.contar('bytes_leidos', sum(sys.getsizeof(valor) for fila in lote for valor in fila))
+        return filas
+
+    def fetchone(self):
+        return self._leer('fetchone')
+
+    def fetchmany(self, size):
+        return self._leer('fetchmany', size)
+
+    def fetchall(self):
+        return self._leer('fetchall')
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+# Conexion SQLite con la misma interfaz que una conexion del pool de mysql.connector:
+# close() la devuelve al pool en lugar de cerrarla
+class ConexionSQLite:
+    def __init__(self, conn, pool):
+        self._conn = conn
+        self._pool = pool
+
+    def is_connected(self):
+        return True
+
+    def cursor(self, **kwargs):
+        return self._conn.cursor()
+
+    def close(self):
+        self._pool.devolver(self._conn)
+
+    def __getattr__(self, nombre):
+        return getattr(self._conn, nombre)
+
+# Error al obtener una conexion (sin importar el driver)
+class ErrorConexion(Exception):
+    pass
+
+# Pool de conexiones con reintentos y backoff exponencial con jitter
+class PoolConexiones:
+    def __init__(self, config):
+        self.config = config
+        self.driver = config['driver']
+        self.estadisticas = {}
+        self._lock = threading.Lock()
+        if self.driver == 'sqlite':
+            self._libres = queue.Queue()
+            for _ in range(config['pool_size']):
+                self._libres.put(sqlite3.connect(config['database'], timeout=config['connect_timeout'], check_same_thread=False))
+        else:
+            # El pool de MySQL se crea con la primera conexion, asi los reintentos cubren tambien su creacion
+            self._pool = None
+
+    def _conectar(self):
+        if self.driver == 'sqlite':
+            try:
+                conn = self._libres.get(timeout=self.config['connect_timeout'])
+            except queue.Empty:
+                raise ErrorConexion("No hay conexiones libres en el pool")
+            return ConexionSQLite(conn, self)
+        # mysql.connector se importa solo si se usa MySQL
+        import mysql.connector
+        from mysql.connector import pooling
+        try:
+            return self._conectar_mysql(pooling)
+        except mysql.connector.Error as e:
+            raise ErrorConexion(str(e)) from e
+
+    def _conectar_mysql(self, pooling):
+        if self._pool is None:
+            self._pool = pooling.MySQLConnectionPool(
+                pool_name='encuesta',
+                pool_size=self.config['pool_size'],
+                host=self.config['host'],
+                port=self.config['port'],
+                user=self.config['user'],
+                password=self.config['password'],
+                database=self.config['database'],
+                connection_timeout=self.config['connect_timeout'],
+            )
+        return self._pool.get_connection()
+
+    def devolver(self, conn):
+        self._libres.put(conn)
+
+    def obtener(self):
+        intentos = self.config['reintentos'] + 1
+        for intento in range(intentos):
+            try:
+                return self._conectar()
+            except ErrorConexion:
+                if intento == intentos - 1:
+                    raise
+                espera = self.config['backoff'] * (2 ** intento)
+                time.sleep(random.uniform(0, espera))
+
+    # Copia de las estadisticas tomada con el lock: otros hilos pueden estar registrando consultas
+    def copiar_estadisticas(self):
+        with self._lock:
+            return {query: dict(estadistica) for query, estadistica in self.estadisticas.items()}
+
+    def registrar_query(self, query, segundos, filas, llamada=True):
+        with self._lock:
+            estadistica = self.estadisticas.setdefault(query, {'llamadas': 0, 'segundos': 0.0, 'filas': 0})
+            estadistica['llamadas'] += int(llamada)
+            estadistica['segundos'] += segundos
+            estadistica['filas'] += filas
+
+_pool = None
+
+def obtener_pool(config=None):
+    global _pool
+    if _pool is None:
+        _pool = PoolConexiones(config or cargar_config())
+    return _pool
+
+# Tiempos por consulta del pool del proceso ({} si no se abrio ninguna conexion)
+def estadisticas_consultas():
+    return _pool.copiar_estadisticas() if _pool is not None else {}
+
+def connectDB(config=None):
+    try:
+        pool = obtener_pool(config)
+        conn = pool.obtener()
+        if conn.is_connected():
+            logger.info("Conexión exitosa a la base de datos")
+            # Cursor sin buffer: las filas se leen del servidor a medida que se piden
+            cursor = CursorMedido(conn.cursor(buffered=False), pool)
+            return conn, cursor
+    except (ErrorConexion, sqlite3.Error) as e:
+        logger.error(f"Error al conectar a la base de datos: {e}")
+        return None, None
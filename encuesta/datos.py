@@ -0,0 +1,130 @@
+""" Lectura de la tabla de la encuesta por lotes """
+from datetime import datetime, timedelta
+
+from .instrumentacion import instrumentacion
+
+# pandas se importa dentro de las funciones: las constantes y es_nulo se usan
+# tambien en el camino rapido (metricas con backend SQL), que no lo necesita
+
+# Columnas que usan las metricas (el resto de la tabla no se trae)
+COLUMNAS_METRICAS = ['satisfeccion_general', 'recomendacion', 'conocia_empresa', 'recomendacion_abierta', 'fecha']
+
+# Tabla por defecto de la encuesta
+TABLA = 'encuesta'
+
+# Clave primaria de la tabla, se usa como marca de agua en el modo incremental
+# (None para usar la columna fecha)
+COLUMNA_ID = 'id'
+
+# Filas por lote al leer la tabla
+CHUNK_SIZE = 50000
+
+# Periodos para agrupar las metricas por fecha
+PERIODOS = ('dia', 'semana', 'mes')
+
+# Formato de la columna fecha (y de los limites de las ventanas que se pasan a la consulta)
+FORMATO_FECHA = '%Y-%m-%d %H:%M:%S'
+
+# None, NaN, NaT o pd.NA (sin necesidad de importar pandas)
+def es_nulo(valor):
+    try:
+        return valor is None or bool(valor != valor)
+    except TypeError:
+        return True
+
+# Convierte un lote a tipos compactos (enteros chicos, categoria y datetime64)
+def tipar_chunk(chunk):
+    import pandas as pd
+    for column in ('satisfeccion_general', 'recomendacion'):
+        if column in chunk.columns:
+            chunk[column] = pd.to_numeric(chunk[column], errors='coerce').astype('Int8')
+    if 'conocia_empresa' in chunk.columns:
+        chunk['conocia_empresa'] = chunk['conocia_empresa'].astype('category')
+    # La fecha se convierte una sola vez, al leer el lote (MySQL ya la entrega como datetime)
+    if 'fecha' in chunk.columns and not pd.api.types.is_datetime64_any_dtype(chunk['fecha']):
+        chunk['fecha'] = pd.to_datetime(chunk['fecha'], format=FORMATO_FECHA, errors='coerce')
+    return chunk
+
+# Ventana de fechas (desde, hasta) con hasta excluido, o None si no se pide ninguna.
+# desde/hasta son texto ISO ("2024-05-01" o "2024-05-01 12:00"); un hasta sin hora
+# incluye ese dia completo. ultimos_dias es una ventana movil que termina ahora
+def ventana_fechas(desde=None, hasta=None, ultimos_dias=None, ahora=None):
+    if desde and ultimos_dias is not None:
+        raise ValueError("No se puede indicar desde y ultimos_dias a la vez")
+    try:
+        inicio = datetime.fromisoformat(desde) if desde else None
+        fin = datetime.fromisoformat(hasta) if hasta else None
+    except ValueError as e:
+        raise ValueError(f"Fecha invalida: {e}") from e
+    if fin is not None and len(hasta) <= 10:
+        fin += timedelta(days=1)
+    if ultimos_dias is not None:
+        inicio = (ahora or datetime.now()) - timedelta(days=float(ultimos_dias))
+    if inicio is None and fin is None:
+        return None
+    if inicio is not None and fin is not None and inicio >= fin:
+        raise ValueError("La ventana de fechas esta vacia (desde debe ser anterior a hasta)")
+    return inicio, fin
+
+# Condicion SQL de la ventana sumada a un filtro existente: un rango sobre fecha
+# que la base resuelve con el indice, asi se leen solo las filas de la ventana
+def filtro_ventana(ventana, filtro=None, params=()):
+    if not ventana:
+        return filtro, tuple(params)
+    condiciones, valores = [f"({filtro})"] if filtro else [], list(params)
+    desde, hasta = ventana
+    if desde is not None:
+        condiciones.append("fecha >= %s")
+        valores.append(desde.strftime(FORMATO_FECHA))
+    if hasta is not None:
+        condiciones.append("fecha < %s")
+        valores.append(hasta.strftime(FORMATO_FECHA))
+    return ' AND '.join(condiciones), tuple(valores)
+
+# Filas de un DataFrame (ej. la tabla de un snapshot) dentro de la ventana
+def filtrar_ventana(data, ventana):
+    if not ventana:
+        return data
+    desde, hasta = ventana
+    mascara = data['fecha'].notna()
+    if desde is not None:
+        mascara &= data['fecha'] >= desde
+    if hasta is not None:
+        mascara &= data['fecha'] < hasta
+    return data[mascara.to_numpy()].reset_index(drop=True)
+
+# Consulta de datos por lotes: el cursor no guarda el resultado completo en memoria
+# y se van entregando DataFrames de a chunk_size filas.
+# filtro es una condicion SQL opcional con sus parametros (ej. "id > %s", (10,))
+def fetch_data_chunks(cursor, chunk_size=CHUNK_SIZE, columnas=COLUMNAS_METRICAS, filtro=None, params=(), orden=None, tabla=TABLA):
+    query = f"SELECT {', '.join(columnas)} FROM {tabla}"
+    if filtro:
+        query += f" WHERE {filtro}"
+    if orden:
+        query += f" ORDER BY {orden}"
+    import pandas as pd
+    cursor.execute(query, params)
+    nombres = [desc[0] for desc in cursor.description]
+    while True:
+        filas = cursor.fetchmany(chunk_size)
+        if not filas:
+            break
+        with instrumentacion.etapa('tipar_chunk'):
+            chunk = tipar_chunk(pd.DataFrame(filas, columns=nombres))
+        yield chunk
+
+# Consulta de datos (tabla completa armada a partir de los lotes)
+def fetch_data(cursor, chunk_size=CHUNK_SIZE):
+    import pandas as pd
+    chunks = list(fetch_data_chunks(cursor, chunk_size))
+    if not chunks:
+        return tipar_chunk(pd.DataFrame(columns=COLUMNAS_METRICAS))
+    data = pd.concat(chunks, ignore_index=True)
+    # Las categorias pueden diferir entre lotes, se vuelven a unificar
+    data['conocia_empresa'] = data['conocia_empresa'].astype('category')
+    return data
+
+# Recorre un DataFrame en lotes (vistas, sin copiar) para los calculos que acumulan por lote
+def lotes(data, chunk_size=CHUNK_SIZE):
+    for inicio in range(0, len(data), chunk_size):
+        yield data.iloc[inicio:inicio + chunk_size]
@@ -0,0 +1,134 @@
+""" Distribuciones: cuantiles exactos de histogramas y t-digest para valores continuos """
+import bisect
+import math
+
+# Escala de las notas de satisfaccion y recomendacion
+ESCALA_NOTAS = range(1, 8)
+
+# Cuantiles que se informan en el resultado y en los graficos
+CUANTILES = (('p10', 0.1), ('mediana', 0.5), ('p90', 0.9))
+
+# Cuantil exacto de un histograma {valor: cantidad} (metodo del rango mas cercano:
+# el menor valor que deja al menos q * total observaciones a su izquierda)
+def cuantil_histograma(histograma, q):
+    total = sum(histograma.values())
+    if not total:
+        return None
+    objetivo = max(1, math.ceil(q * total))
+    acumulado = 0
+    for valor in sorted(histograma):
+        acumulado += histograma[valor]
+        if acumulado >= objetivo:
+            return valor
+
+def resumen_histograma(histograma):
+    return {nombre: cuantil_histograma(histograma, q) for nombre, q in CUANTILES}
+
+# Sketch de cuantiles t-digest (variante "merging", con la funcion de escala k1):
+# los valores se agrupan en centroides (media, peso) que son mas chicos en las colas,
+# asi p10/p90 quedan con buen error relativo usando unos pocos cientos de centroides.
+# Dos digests se combinan con merge (lotes, particiones o corridas incrementales)
+class TDigest:
+    def __init__(self, compresion=100):
+        self.compresion = compresion
+        self.centroides = []
+        self._pendientes = []
+        self.total = 0
+        self.minimo = None
+        self.maximo = None
+
+    # Agrega valores, opcionalmente con su peso (ej. los conteos de value_counts)
+    def agregar(self, valores, pesos=None):
+        valores = [float(valor) for valor in valores]
+        pesos = [1] * len(valores) if pesos is None else [int(peso) for peso in pesos]
+        if not valores:
+            return self
+        self._pendientes.extend(zip(valores, pesos))
+        self.total += sum(pesos)
+        self.minimo = min(valores) if self.minimo is None else min(self.minimo, min(valores))
+        self.maximo = max(valores) if self.maximo is None else max(self.maximo, max(valores))
+        if len(self._pendientes) > 20 * self.compresion:
+            self._comprimir()
+        return self
+
+    def merge(self, otro):
+        otro._comprimir()
+        if otro.total:
+            self._pendientes.extend(otro.centroides)
+            self.total += otro.total
+            self.minimo = otro.minimo if self.minimo is None else min(self.minimo, otro.minimo)
+            self.maximo = otro.maximo if self.maximo is None else max(self.maximo, otro.maximo)
+            self._comprimir()
+        return self
+
+    def _limite(self, q):
+        # k1(q) = compresion / (2 pi) * asin(2q - 1): cada centroide abarca a lo sumo una unidad de k
+        k = self.compresion / (2 * math.pi) * math.asin(2 * q - 1) + 1
+        if k >= self.compresion / 4:
+            return 1.0
+        return (math.sin(2 * math.pi * k / self.compresion) + 1) / 2
+
+    def _comprimir(self):
+        if not self._pendientes:
+            return
+        puntos = sorted(self.centroides + self._pendientes)
+        self._pendientes = []
+        centroides = []
+        media, peso = puntos[0]
+        acumulado = 0
+        limite = self._limite(0)
+        for siguiente, peso_siguiente in puntos[1:]:
+            if (acumulado + peso + peso_siguiente) / self.total <= limite:
+                media += (siguiente - media) * peso_siguiente / (peso + peso_siguiente)
+                peso += peso_siguiente
+            else:
+                centroides.append((media, peso))
+                acumulado += peso
+                limite = self._limite(acumulado / self.total)
+                media, peso = siguiente, peso_siguiente
+        centroides.append((media, peso))
+        self.centroides = centroides
+
+    # Cuantil aproximado: se interpola entre los centros de los centroides vecinos
+    # (y entre el minimo/maximo exactos en las puntas)
+    def cuantil(self, q):
+        self._comprimir()
+        if not self.total:
+            return None
+        objetivo = q * self.total
+        posiciones, medias = [0.0], [self.minimo]
+        acumulado = 0
+        for media, peso in self.centroides:
+            posiciones.append(acumulado + peso / 2)
+            medias.append(media)
+            acumulado += peso
+        posiciones.append(float(self.total))
+        medias.append(self.maximo)
+        indice = min(max(bisect.bisect_right(posiciones, objetivo), 1), len(posiciones) - 1)
+        desde, hasta = posiciones[indice - 1], posiciones[indice]
+        if hasta == desde:
+            return medias[indice]
+        return medias[indice - 1] + (medias[indice] - medias[indice - 1]) * (objetivo - desde) / (hasta - desde)
+
+    def resumen(self):
+        if not self.total:
+            return None
+        resumen = {nombre: self.cuantil(q) for nombre, q in CUANTILES}
+        resumen.update(minimo=self.minimo, maximo=self.maximo, cantidad=self.total)
+        return resumen
+
+    def to_dict(self):
+        self._comprimir()
+        return {
+            'compresion': self.compresion, 'total': self.total, 'minimo': self.minimo, 'maximo': self.maximo,
+            'centroides': [list(centroide) for centroide in self.centroides],
+        }
+
+    @classmethod
+    def from_dict(cls, estado):
+        digest = cls(estado['compresion'])
+        digest.total = estado['total']
+        digest.minimo = estado['minimo']
+        digest.maximo = estado['maximo']
+        digest.centroides = [tuple(centroide) for centroide in estado['centroides']]
+        return digest
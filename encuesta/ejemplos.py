@@ -0,0 +1,200 @@
+""" Comentarios de ejemplo clasificados previamente con ChatGPT """
+
+# Lista de comentarios de ejemplo (clasificados con ChatGPT)
+COMENTARIOS_EJEMPLO = [
+    {
+        'comment': "Por la pésima experiencia, en la creación de el condominio, mínimo deberíamos tener estacionamiento de visitas.",
+        'sentiment': "Negativo",
+        'problems': ["Mala experiencia general", "Falta de estacionamiento de visitas"]
+    },
+    {
+        'comment': "El trato no fue el correcto, partiendo por la persona que me atendió para venderme el departamento, además de los problemas del departamento, con fallas y detalles. Además de los nulos estacionamientos de visitas y precios elevados de los estacionamientos.",
+        'sentiment': "Negativo",
+        'problems': ["Mal trato del personal de ventas", "Fallas en el departamento", "Falta de estacionamientos de visitas", "Precios elevados de estacionamientos"]
+    },
+    {
+        'comment': "Se equivocan en las propuestas entregadas a los bancos, asumimos un aumento del valor, siendo que ellos se equivocaron, además la administración del condominio deja mucho que desear: malos administradores, cobros injustificados, cobros que no deberíamos de asumir nosotros los propietarios y se incluyeron en los gastos comunes, se están agregando modificaciones en el condominio que debería haber sido asumido por la inmobiliaria al momento de la entrega (una multicancha, unos bordes que van en las escaleras, topes de estacionamientos, siendo que no todos los propietarios tenemos estacionamientos).",
+        'sentiment': "Negativo",
+        'problems': ["Errores en las propuestas bancarias", "Mala administración", "Cobros injustificados", "Cobros incluidos en gastos comunes", "Modificaciones no asumidas por la inmobiliaria"]
+    },
+    {
+        'comment': "Lo único malo es la calidad de las ventanas. No aíslan lo suficientemente el frío y el ruido. Adicionalmente muy mala la elección de administrador.",
+        'sentiment': "Negativo",
+        'problems': ["Mala calidad de las ventanas", "Mala elección de administrador"]
+    },
+    {
+        'comment': "Muy mala la atención y servicio de garantía.",
+        'sentiment': "Negativo",
+        'problems': ["Mala atención", "Mal servicio de garantía"]
+    },
+    {
+        'comment': "Por muchas razones y la más importante que a los 2 meses que me entregaron me llovió en la pieza y no han respondido, dan solo soluciones parches.",
+        'sentiment': "Negativo",
+        'problems': ["Fugas de agua", "Falta de respuesta", "Soluciones temporales"]
+    },
+    {
+        'comment': "Puff millones, partiendo porque tienen un nivel de irresponsabilidad tremenda, tuve que firmar 2 veces mi escritura! Ninguna inmobiliaria seria se atrevería a cometer semejante error, lo mismo mi estacionamiento, está pagado y aún no puedo firmar escritura porque se equivocó no sé quién, no sé cómo no se preocupan de verificar que estas cosas no pasen. Tendré que ir a firmar de nuevo y ni siquiera me avisan, tuve que yo para variar y preguntar qué pasaba por la demora.",
+        'sentiment': "Negativo",
+        'problems': ["Errores en la firma de escrituras", "Falta de comunicación", "Irresponsabilidad"]
+    },
+    {
+        'comment': "Calidad general.",
+        'sentiment': "Neutro",
+        'problems': []
+    },
+    {
+        'comment': "Muchas demora, información errada con respecto a los montos del subsidio y nula culpa de parte de la empresa, solo nos dieron la opción de pedir la devolución del dinero, cuando la diferencia eran cerca de 80 USD de diferencia. Ojalá ganarme la giftcard y así compensar el mal rato.",
+        'sentiment': "Negativo",
+        'problems': ["Demoras", "Información incorrecta sobre subsidios", "Falta de responsabilidad de la empresa"]
+    },
+    {
+        'comment': "Pésima gestión en todas las etapas de adquisición de inmueble. Pésimo trato y servicio de postventa. Pésima calidad de producto entregado. Pésima comunicación con el cliente en relación de resolución de problemas. ¿De verdad tiene cara de mandarme que los evalúe? Jajaja",
+        'sentiment': "Negativo",
+        'problems': ["Mala gestión", "Mal trato", "Mala calidad del producto", "Mala comunicación"]
+    },
+    {
+        'comment': "Ninguna razón si la recomiendo.",
+        'sentiment': "Positivo",
+        'problems': []
+    },
+    {
+        'comment': "Proyecto presenta deficiencias. Si bien proceso de compra fue expedito, hay detalles del proyecto que se evidencian de mala calidad.",
+        'sentiment': "Negativo",
+        'problems': ["Deficiencias del proyecto", "Mala calidad en detalles"]
+    },
+    {
+        'comment': "Ninguna, tuve una espectacular compra, me asesoraron y apoyaron en todo, muy agradecido.",
+        'sentiment': "Positivo",
+        'problems': []
+    },
+    {
+        'comment': "La recomendaría, pero podrían mejorar el servicio de postventa. Es lento, poco amable.",
+        'sentiment': "Neutro",
+        'problems': ["Servicio de postventa lento", "Servicio de postventa poco amable"]
+    },
+    {
+        'comment': "Mala calidad de los departamentos, materiales y terminaciones pésimas.",
+        'sentiment': "Negativo",
+        'problems': ["Mala calidad de departamentos", "Materiales de mala calidad", "Terminaciones pésimas"]
+    },
+    {
+        'comment': "La gestión del personal de venta fue lenta y de muy mala calidad, citándome a firmar en varias ocasiones los mismos documentos por olvido de ellos el no haber firmado alguno y entregando información falsa con respecto al modo de pago del estacionamiento ya que yo pregunte si podía pagarlo con un pie y el resto en cuotas y se me dijo que sí y posteriormente se me informa que no SE PUEDE PAGAR DE ESA MANERA ASÍ COMO UN SINFIN DE FALTA DE GESTIÓN DEL PERSONAL DE VENTA.",
+        'sentiment': "Negativo",
+        'problems': ["Mala gestión del personal de ventas", "Citaciones repetidas", "Información falsa sobre modo de pago", "Falta de gestión del personal de venta"]
+    },
+    {
+        'comment': "La postventa es muy mala no ayudan ni dan soluciones rápidamente son demasiado malos los ejecutivos a cargo.",
+        'sentiment': "Negativo",
+        'problems': ["Mala postventa", "Falta de soluciones rápidas", "Malos ejecutivos"]
+    },
+    {
+        'comment': "Pésima atención de postventa, departamento defectuoso.",
+        'sentiment': "Negativo",
+        'problems': ["Mala atención de postventa", "Departamento defectuoso"]
+    },
+    {
+        'comment': "Compré departamento con subsidio DS19, hicieron algunas cosas muy mal, como no calcular correctamente el monto del subsidio, muchas familias se quedaron sin departamento por este motivo, sin mencionar que los que sí pudimos comprar tuvimos que hacer un sacrificio enorme, no estacionamientos de visita en el condominio, lo cual me parece fatal. Hay errores básicos de construcción como dejar del lado incorrecto la apertura de los ventanales y un par de cosas más.",
+        'sentiment': "Negativo",
+        'problems': ["Errores en cálculo del subsidio", "Falta de estacionamientos de visita", "Errores básicos de construcción"]
+    },
+    {
+        'comment': "Poca transparencia al vender, se me vendió como Proyecto Marla Central dando a entender que la entrada es por Marla, pero la realidad es que debemos dar toda una vuelta para entrar al condominio, se me dijo también que era la última unidad disponible sin darme la opción de escoger, cuando llegué, me di cuenta que a todos nos dijeron lo mismo, dan mucho espacio a la venta de estacionamiento y poco juegos para niños y áreas verdes, los estacionamientos costosos, la administración de primeras instancias pocas soluciones y muchos problemas, los departamentos defectuosos y no se todo le dan solución, en fin, no muy grata la experiencia de hecho podría continuar, se me debería incluso indemnizar por todos los malos ratos que he pasado.",
+        'sentiment': "Negativo",
+        'problems': ["Falta de transparencia", "Información falsa", "Problemas de administración", "Departamentos defectuosos"]
+    },
+    {
+        'comment': "Por no responder a fallas que han tenido los departamentos, por no haber respetado el monto de subsidio, por no dar claridad de la entrega total del terreno del proyecto. Por no entregar las instalaciones pulcras.",
+        'sentiment': "Negativo",
+        'problems': ["Falta de respuesta a fallas", "Incumplimiento del subsidio", "Falta de claridad en la entrega del terreno", "Instalaciones sucias"]
+    },
+    {
+        'comment': "Claro que sí, el servicio de postventa fue muy arbitrario al ser solicitado para reparaciones, en este caso subí la información al portal con evidencias, sin embargo, la persona que visitó mi departamento fue quien finalmente juzgó a su criterio si la reparación procede o no sin tener ningún parámetro más allá que su juicio personal sobre el caso. Por lo demás, en el proceso de compra se nos entregó falsa información sobre la disponibilidad de departamento limitando mi opción de compra a un único departamento, la vendedora me contaba que estaba todo 100% vendido y que el departamento que ella me ofrecía era el último disponible y no tenía otra alternativa... Con el tiempo me da la impresión que eso no era del todo cierto... Hasta la fecha aún hay departamentos disponibles de 1b 1d. Tampoco me dieron la opción de cambiar o algo... Por eso fue mala la experiencia.",
+        'sentiment': "Negativo",
+        'problems': ["Servicio de postventa arbitrario", "Falsa información sobre disponibilidad de departamentos", "Opciones de compra limitadas"]
+    },
+    {
+        'comment': "Ninguno.",
+        'sentiment': "Positivo",
+        'problems': ["Ninguno"]
+    },
+    {
+        'comment': "Gestión administrativa, coordinación, tiempo de respuesta a requerimientos, postventa, todo pésimo. Hubo malas gestiones, mala información.",
+        'sentiment': "Negativo",
+        'problems': ["Mala gestión administrativa", "Mala coordinación", "Tiempos de respuesta largos", "Mala postventa"]
+    },
+    {
+        'comment': "La atención al cliente cuando recién compré fue pésima, el chico que me entregó las llaves no me atendía el teléfono jamás ante mis consultas, se demoran demasiado en las correcciones de postventa, algunos tickets fueron cerrados sin haberles dado solución, la chica rubia teñida que era como jefa de obra o de entrega o algo así era súper pesada y agresiva para hablar, todos los vecinos a los que les pregunté tuvieron el mismo drama con ella, los gastos comunes siguen subiendo excesivamente y no tenemos ascensor, ni siquiera estacionamiento de visita como para justificar algo, llevan meses arreglando el jardín y aún no está listo, los plásticos esos para cerrar el paso se ven horribles, pero como no se avanza con el arreglo no se puede sacar.",
+        'sentiment': "Negativo",
+        'problems': ["Mala atención al cliente", "Demoras en correcciones de postventa", "Falta de soluciones", "Gastos comunes altos", "Falta de ascensor", "Falta de estacionamiento de visita", "Arreglos del jardín incompletos"]
+    },
+    {
+        'comment': "Lo encuentro que es un buen proyecto.",
+        'sentiment': "Positivo",
+        'problems': ["Ninguno"]
+    },
+    {
+        'comment': "Por publicidad engañosa ya que el proyecto se llama Marla siendo que en ningún momento tiene salida por Av. Marla ya sea peatonal o por vehículo, cuando compré el departamento me dijeron que el strip iba a tener estos accesos pero después se fue desmintiendo. Los estacionamientos son demasiado caros, prácticamente es el pie para una casa y por otro lado hay algunas terminaciones malas, al primer día se me salió una chapa y la semana me falló un enchufe. Si a futuro tengo la posibilidad de comprarme otro inmueble, no dudaré en no elegirlos.",
+        'sentiment': "Negativo",
+        'problems': ["Publicidad engañosa", "Estacionamientos caros", "Malas terminaciones"]
+    },
+    {
+        'comment': "Las terminaciones de los departamentos no son las mejores.",
+        'sentiment': "Negativo",
+        'problems': ["Malas terminaciones"]
+    },
+    {
+        'comment': "Malos materiales, malas terminaciones, las cosas están mal instaladas. Etc.",
+        'sentiment': "Negativo",
+        'problems': ["Malos materiales", "Malas terminaciones", "Mala instalación"]
+    },
+    {
+        'comment': "El servicio de postventa es muy lento.",
+        'sentiment': "Negativo",
+        'problems': ["Servicio de postventa lento"]
+    },
+    {
+        'comment': "Todo el proceso de obtención de crédito, no fue lo suficientemente acompañado.",
+        'sentiment': "Negativo",
+        'problems': ["Falta de acompañamiento en el proceso de obtención de crédito"]
+    },
+    {
+        'comment': "La respuesta de postventa es muy lenta. Con respuesta no me refiero a que respondan un mensaje, sino que una vez resuelto qué hacer, toman mucho tiempo para ejecutar.",
+        'sentiment': "Negativo",
+        'problems': ["Postventa lenta en ejecución de soluciones"]
+    },
+    {
+        'comment': "Postventa deficiente y materiales de construcción de baja calidad.",
+        'sentiment': "Negativo",
+        'problems': ["Postventa deficiente", "Materiales de baja calidad"]
+    },
+    {
+        'comment': "Se requiere mejorar el servicio postventa en la atención de las incidencias reportadas.",
+        'sentiment': "Neutro",
+        'problems': ["Servicio postventa en atención de incidencias"]
+    },
+    {
+        'comment': "No tengo fundamento para no recomendarla, ya que cumple todo lo que ellos muestran, son súper transparentes.",
+        'sentiment': "Positivo",
+        'problems': ["Ninguno"]
+    },
+    {
+        'comment': "Sería por el motivo que postventa demora mucho en responder y realizar las respectivas reparaciones.",
+        'sentiment': "Negativo",
+        'problems': ["Postventa lenta en respuestas y reparaciones"]
+    },
+    {
+        'comment': "Porque hubo demasiadas falencias en el proceso de compra, errores por parte de la inmobiliaria, falta a la verdad (nos vendieron un proyecto que tenía salida a Marla y finalmente no fue así). Ni siquiera tiene estacionamientos de visita.",
+        'sentiment': "Negativo",
+        'problems': ["Falencias en el proceso de compra", "Errores de la inmobiliaria", "Falta de verdad", "Falta de estacionamientos de visita"]
+    },
+    {
+        'comment': "Mala atención al cliente.",
+        'sentiment': "Negativo",
+        'problems': ["Mala atención al cliente"]
+    },
+    {
+        'comment': "El servicio postventa es muy engorroso. Nadie se hace responsable y solo derivan. Estuve más de seis meses tratando de que me reembolsaran los primeros gastos de servicio de luz, agua y gas. Enviaba correos y no respondían. Cuando tuve un problema con el calefont, no dieron solución siendo que aún estaba vigente la garantía. Tuve que ver por mis propios medios alguna solución.",
+        'sentiment': "Negativo",
+        'problems': ["Servicio postventa engorroso", "Falta de responsabilidad", "Falta de respuesta", "Falta de solución a problemas bajo garantía"]
+    }
+]
@@ -0,0 +1,144 @@
+""" Graficos en memoria """
+import io
+import zlib
+
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from .instrumentacion import instrumentacion
+
+# Se dibuja con el backend Agg sobre figuras que se reutilizan entre informes,
+# y la imagen se pasa al PDF como pixeles en memoria (sin PNG temporales en disco)
+_figuras = {}
+
+def obtener_figura(nombre, figsize):
+    fig = _figuras.get(nombre)
+    if fig is None:
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        _figuras[nombre] = fig
+    else:
+        fig.clear()
+    return fig
+
+# Imagen RGB comprimida en el formato que FPDF guarda internamente para sus imagenes
+def figura_a_imagen(fig):
+    with instrumentacion.etapa('rasterizar_grafico'):
+        fig.canvas.draw()
+    rgba = np.asarray(fig.canvas.buffer_rgba())
+    alto, ancho = rgba.shape[:2]
+    return {
+        'w': ancho, 'h': alto, 'cs': 'DeviceRGB', 'bpc': 8, 'f': 'FlateDecode',
+        'pal': '', 'trns': '', 'data': zlib.compress(rgba[:, :, :3].tobytes()),
+    }
+
+# PNG en memoria (para servirlo o guardarlo aparte)
+def figura_a_png(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+# Guarda el grafico en disco; con extension .svg o .pdf la salida es vectorial
+def guardar_grafico(fig, path):
+    fig.savefig(path)
+
+# Grafico vacio (ej. una ventana de fechas sin respuestas): matplotlib no dibuja tortas de total 0
+def sin_datos(ax, texto='Sin respuestas'):
+    ax.text(0.5, 0.5, texto, ha='center', va='center', transform=ax.transAxes, color='gray')
+    ax.axis('off')
+
+# Lineas verticales en la mediana, p10 y p90 sobre las barras de un histograma
+def _marcar_cuantiles(ax, histograma, distribucion):
+    # Sin notas (histograma vacio) el resumen trae los cuantiles en None y no se marca nada
+    if not distribucion or distribucion.get('mediana') is None:
+        return
+    valores = list(histograma)
+    for nombre, estilo in (('p10', ':'), ('mediana', '-'), ('p90', ':')):
+        valor = distribucion.get(nombre)
+        if valor in valores:
+            ax.axvline(valores.index(valor), color='dimgray', linestyle=estilo, linewidth=1.5, label=f"{nombre}: {valor}")
+    ax.legend(loc='upper left', fontsize='small')
+
+# Graficos de los calculos (a partir del resultado de MetricasEncuesta)
+def crear_graficos(resultado, path=None):
+    fig = obtener_figura('metricas', (14, 8))
+
+    ax = fig.add_subplot(2, 2, 1)
+    histograma = resultado['histograma_satisfaccion']
+    ax.bar([str(valor) for valor in histograma], list(histograma.values()), color='skyblue')
+    _marcar_cuantiles(ax, histograma, resultado.get('distribucion_satisfaccion'))
+    ax.set_title('Distribución de la Satisfacción General')
+    ax.set_xlabel('Satisfacción')
+    ax.set_ylabel('Frecuencia')
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+
+    ax = fig.add_subplot(2, 2, 2)
+    histograma = resultado['histograma_recomendacion']
+    ax.bar([str(valor) for valor in histograma], list(histograma.values()), color='salmon')
+    _marcar_cuantiles(ax, histograma, resultado.get('distribucion_recomendacion'))
+    ax.set_title('Distribución de la Recomendación')
+    ax.set_xlabel('Recomendación')
+    ax.set_ylabel('Frecuencia')
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+
+    ax = fig.add_subplot(2, 2, 3)
+    conocia = ['Conocían', 'No Conocían']
+    total_conocian = resultado['total_conocian']
+    sizes = [total_conocian, resultado['total_respuestas'] - total_conocian]
+    if sum(sizes):
+        ax.pie(sizes, labels=conocia, autopct='%1.1f%%', colors=['lightgreen', 'lightcoral'])
+    else:
+        sin_datos(ax)
+    ax.set_title('Conocimiento de la Empresa')
+
+    ax = fig.add_subplot(2, 2, 4)
+    total_comentarios = resultado['total_comentarios']
+    ax.bar(['True', 'False'], [total_comentarios, resultado['total_respuestas'] - total_comentarios], color='gold')
+    ax.set_title('Comentarios Realizados')
+    ax.set_xlabel('Se realizaron comentarios')
+    ax.set_ylabel('Frecuencia')
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+
+    fig.tight_layout()
+    fig.subplots_adjust(hspace=0.5)
+    if path:
+        guardar_grafico(fig, path)
+    return fig
+
+# Etiqueta de cada segmento a partir de sus dimensiones (o "Total" si solo hay periodo)
+def _etiqueta_segmento(segmentos, dimensiones):
+    if not dimensiones:
+        return pd.Series('Total', index=segmentos.index)
+    return segmentos[list(dimensiones)].astype(str).agg(' / '.join, axis=1)
+
+# Grafico de tendencia del SNG de recomendacion por periodo (los segmentos con mas
+# respuestas), o de barras por segmento si no se agrupo por periodo
+def crear_grafico_segmentos(segmentos, dimensiones=(), periodo=None, max_series=8, path=None):
+    fig = obtener_figura('segmentos', (14, 6))
+    ax = fig.add_subplot()
+    etiquetas = _etiqueta_segmento(segmentos, dimensiones)
+    if periodo:
+        principales = segmentos.groupby(etiquetas)['total_respuestas'].sum().nlargest(max_series).index
+        tendencia = segmentos[etiquetas.isin(principales)].assign(segmento=etiquetas).pivot_table(
+            index='periodo', columns='segmento', values='sng_recomendacion', aggfunc='first')
+        for segmento in tendencia.columns:
+            ax.plot(tendencia.index, tendencia[segmento], marker='o', label=segmento)
+        ax.set_title('Tendencia del SNG de recomendación')
+        ax.set_xlabel('Periodo')
+        ax.legend(loc='best', fontsize='small')
+        ax.tick_params(axis='x', labelrotation=45)
+    else:
+        principales = segmentos.assign(segmento=etiquetas).nlargest(max_series * 2, 'total_respuestas')
+        ax.bar(principales['segmento'], principales['sng_recomendacion'], color='salmon')
+        ax.set_title('SNG de recomendación por segmento')
+        ax.tick_params(axis='x', labelrotation=45)
+    ax.set_ylabel('SNG (%)')
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+    fig.tight_layout()
+    if path:
+        guardar_grafico(fig, path)
+    return fig
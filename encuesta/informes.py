@@ -0,0 +1,404 @@
+""" Informes PDF: seccion de metricas, de segmentos y de comentarios, y el informe completo """
+import random
+
+from fpdf import FPDF
+
+from .datos import es_nulo
+from .graficos import crear_grafico_segmentos, crear_graficos, figura_a_imagen, obtener_figura, sin_datos
+from .instrumentacion import instrumentacion, logger
+from .problemas import agregar_problemas
+from .segmentos import claves_segmento
+
+# Permite agregar al PDF imagenes desde un archivo o desde figura_a_imagen
+class ImagenesEnMemoria:
+    def imagen(self, imagen, x, y, w):
+        if isinstance(imagen, str):
+            return self.image(imagen, x=x, y=y, w=w)
+        nombre = f"__memoria_{len(self.images)}"
+        self.images[nombre] = dict(imagen, i=len(self.images) + 1)
+        self.image(nombre, x=x, y=y, w=w)
+
+# Configuración del primer archivo PDF
+class PDFMetricas(ImagenesEnMemoria, FPDF):
+    def header(self):
+        self.set_font('Arial', 'B', 16)
+        self.cell(0, 10, 'Informe de la Encuesta', 0, 1, 'C')
+
+    def chapter_title(self, title):
+        self.set_font('Arial', 'B', 14)
+        self.cell(0, 10, title, 0, 1, 'L')
+        self.ln(2)
+
+    def chapter_body(self, body):
+        self.set_font('Arial', '', 12)
+        self.multi_cell(0, 10, body)
+        self.ln()
+
+    def add_graphics(self, imagen):
+        # Si el grafico no entra en lo que queda de la pagina, se pasa a la siguiente
+        if not isinstance(imagen, str) and self.get_y() + 190 * imagen['h'] / imagen['w'] > self.page_break_trigger:
+            self.add_page()
+        self.imagen(imagen, x=10, y=self.get_y(), w=190)
+        self.ln(85)
+
+    def add_tabla(self, encabezados, filas, anchos):
+        self.set_font('Arial', 'B', 9)
+        self.set_fill_color(230, 230, 230)
+        for encabezado, ancho in zip(encabezados, anchos):
+            self.cell(ancho, 7, encabezado, 1, 0, 'C', True)
+        self.ln()
+        self.set_font('Arial', '', 9)
+        for fila in filas:
+            for indice, (valor, ancho) in enumerate(zip(fila, anchos)):
+                self.cell(ancho, 6, texto_pdf(str(valor)), 1, 0, 'L' if indice == 0 else 'R')
+            self.ln()
+        self.ln(4)
+
+# Valor formateado, o "-" si no se pudo calcular (ej. promedio o duracion sin respuestas)
+def _valor(valor, formato=''):
+    return '-' if es_nulo(valor) else format(valor, formato)
+
+# Respuestas por dia y dias desde la ultima respuesta (sin fechas no se escriben)
+def _texto_actividad(resultado):
+    if resultado.get('respuestas_por_dia') is None:
+        return ""
+    return (f"Respuestas por día: {resultado['respuestas_por_dia']:.1f}\n"
+            f"Días desde la última respuesta: {resultado['dias_desde_ultima_respuesta']}\n")
+
+# Mediana y p10-p90 de las notas y del tiempo entre respuestas (si se calcularon)
+def _texto_distribuciones(resultado):
+    texto = ""
+    for clave, nombre in (('distribucion_satisfaccion', 'satisfacción general'), ('distribucion_recomendacion', 'recomendación')):
+        distribucion = resultado.get(clave)
+        if distribucion and distribucion['mediana'] is not None:
+            texto += f"Mediana de {nombre}: {distribucion['mediana']} (p10: {distribucion['p10']}, p90: {distribucion['p90']})\n"
+    tiempos = resultado.get('tiempo_entre_respuestas')
+    if tiempos:
+        texto += (f"Tiempo entre respuestas: mediana {tiempos['mediana'] / 60:.1f} min "
+                  f"(p10: {tiempos['p10'] / 60:.1f} min, p90: {tiempos['p90'] / 60:.1f} min)\n")
+    return texto
+
+# Escribe la seccion de metricas (resultado de MetricasEncuesta) en el PDF
+# (graficos_path es opcional, solo para guardar ademas los graficos en un archivo)
+def escribir_seccion_metricas(pdf, resultado, graficos_path=None):
+    # Crear gráficos
+    fig = crear_graficos(resultado, graficos_path)
+
+    pdf.chapter_title('Resultados obtenidos:')
+    if not resultado['total_respuestas']:
+        pdf.chapter_body("Sin respuestas en el periodo seleccionado.\n")
+    pdf.chapter_body(
+        f"SNG de satisfacción general: {resultado['sng_satisfaccion']:.2f}%\n"
+        f"Total de personas que conocían a la empresa: {resultado['total_conocian']}\n"
+        f"SNG de recomendación: {resultado['sng_recomendacion']:.2f}%\n"
+        f"Nota promedio de la recomendación: {_valor(resultado['promedio_recomendacion'], '.2f')}\n"
+        f"Total de personas que hicieron un comentario: {resultado['total_comentarios']}\n"
+        f"Días que lleva la encuesta: {_valor(resultado['dias_encuesta'])} días\n"
+        f"La encuesta lleva {_valor(resultado['meses_encuesta'])} meses y {_valor(resultado['dias_restantes'])} días\n"
+        + _texto_actividad(resultado)
+        + _texto_distribuciones(resultado)
+    )
+
+    pdf.chapter_title('Gráficos: ')
+    pdf.add_graphics(figura_a_imagen(fig))
+
+def _rango_notas(fila):
+    if es_nulo(fila.mediana_recomendacion):
+        return '-'
+    return f"{fila.p10_recomendacion:.0f} - {fila.mediana_recomendacion:.0f} - {fila.p90_recomendacion:.0f}"
+
+# Escribe la tabla de metricas por segmento (los max_filas segmentos con mas respuestas)
+# y su grafico de tendencia
+def escribir_seccion_segmentos(pdf, segmentos, dimensiones=(), periodo=None, max_filas=40):
+    claves = claves_segmento(dimensiones, periodo)
+    principales = segmentos.nlargest(max_filas, 'total_respuestas').sort_values(claves)
+    etiquetas = principales[claves].astype(str).agg(' / '.join, axis=1)
+    filas = [
+        (etiqueta, fila.total_respuestas, f"{fila.sng_satisfaccion:.1f}", f"{fila.sng_recomendacion:.1f}",
+         _valor(fila.promedio_recomendacion, '.2f'), _rango_notas(fila), f"{fila.tasa_conocian:.1f}", f"{fila.tasa_comentarios:.1f}")
+        for etiqueta, fila in zip(etiquetas, principales.itertuples(index=False))
+    ]
+    pdf.chapter_title(f"Métricas por {' / '.join(claves)}:")
+    if len(segmentos) > max_filas:
+        pdf.chapter_body(f"Se muestran los {max_filas} segmentos con más respuestas de {len(segmentos)}.")
+    pdf.add_tabla(
+        ['Segmento', 'Respuestas', 'SNG satisf.', 'SNG recom.', 'Prom. recom.', 'Recom. p10-p50-p90', '% conocían', '% coment.'],
+        filas, [46, 20, 20, 20, 20, 30, 17, 17],
+    )
+    pdf.chapter_title('Tendencia: ')
+    pdf.add_graphics(figura_a_imagen(crear_grafico_segmentos(segmentos, dimensiones, periodo)))
+
+# Escribe el PDF en una ruta o en un stream binario (ej. sys.stdout.buffer)
+# y cuenta paginas y bytes escritos
+def escribir_pdf(pdf, destino):
+    with instrumentacion.etapa('escribir_pdf'):
+        contenido = pdf.output(dest='S').encode('latin-1')
+        if isinstance(destino, str):
+            with open(destino, 'wb') as f:
+                f.write(contenido)
+        else:
+            destino.write(contenido)
+            destino.flush()
+    instrumentacion.contar('paginas_pdf', pdf.page_no())
+    instrumentacion.contar('bytes_pdf', len(contenido))
+
+# Genera el PDF de metricas a partir del resultado de MetricasEncuesta
+def generar_informe_metricas(resultado, pdf_path='Informe_encuesta.pdf', graficos_path=None):
+    # Crear PDF con los calculos y gráficos
+    pdf = PDFMetricas()
+    pdf.add_page()
+    escribir_seccion_metricas(pdf, resultado, graficos_path)
+    escribir_pdf(pdf, pdf_path)
+    return pdf
+
+
+### Seccion de comentarios (analisis de sentimiento de ChatGPT) ###
+
+COLORES_SENTIMIENTO = {'negativo': (255, 0, 0), 'positivo': (0, 255, 0)}
+
+def color_sentimiento(sentiment):
+    return COLORES_SENTIMIENTO.get(sentiment.lower(), (0, 0, 255))
+
+# Las fuentes base de FPDF solo admiten latin-1
+def texto_pdf(texto):
+    return texto.encode('latin-1', 'replace').decode('latin-1')
+
+# Recorta el texto para que entre en una linea del ancho dado
+def recortar_texto(pdf, texto, ancho):
+    texto = ' '.join(texto.split())
+    if pdf.get_string_width(texto) <= ancho:
+        return texto
+    while texto and pdf.get_string_width(texto + '...') > ancho:
+        texto = texto[:int(len(texto) * 0.9)]
+    return texto.rstrip() + '...'
+
+class PDFComentarios(ImagenesEnMemoria, FPDF):
+    def __init__(self):
+        super().__init__()
+        self.title_added = False
+
+    def header(self):
+        if self.page_no() == 1 and not self.title_added:
+            self.set_font("Arial", "B", 16)
+            self.cell(0, 10, "Informe sobre las respuestas abiertas", 0, 1, "C")
+            self.title_added = True 
+            self.ln(10)
+
+    def chapter_title(self, title):
+        self.set_font("Arial", "B", 12)
+        self.cell(0, 10, title, 0, 1, "L")
+        self.ln(5)
+
+    def chapter_body(self, body):
+        self.set_font("Arial", "", 12)
+        self.multi_cell(0, 10, body)
+        self.ln()
+
+    def add_comment(self, index, comment, sentiment, problems):
+        self.set_font("Arial", "B", 12)
+        self.cell(10, 10, f"#{index}:", 0, 0)
+        self.set_font("Arial", "", 12)
+        self.multi_cell(0, 10, texto_pdf(comment))
+        self.ln(2)
+
+        self.set_text_color(*color_sentimiento(sentiment))
+        self.cell(60, 10, f"        Sentimiento: {sentiment}", 0, 1)
+        self.set_text_color(0, 0, 0)
+        self.ln(1)
+
+        self.cell(60, 10, f"        Problemas:", 0, 1)
+        for problem in problems:
+            self.cell(60, 10, texto_pdf(f"        - {problem}"), 0, 1)
+        self.ln(5)
+
+    # Tabla de sentimientos: cantidad y porcentaje
+    def add_resumen_sentimientos(self, sentiment_counts):
+        total = sum(sentiment_counts.values()) or 1
+        self.chapter_title("Resumen de sentimientos")
+        self.set_font("Arial", "B", 11)
+        self.set_fill_color(230, 230, 230)
+        for texto, ancho in (("Sentimiento", 90), ("Comentarios", 50), ("%", 50)):
+            self.cell(ancho, 8, texto, 1, 0, "C", True)
+        self.ln()
+        self.set_font("Arial", "", 11)
+        for sentiment, cantidad in sentiment_counts.items():
+            self.cell(90, 8, sentiment, 1, 0)
+            self.cell(50, 8, str(cantidad), 1, 0, "R")
+            self.cell(50, 8, f"{cantidad / total * 100:.1f}", 1, 1, "R")
+        self.ln(5)
+
+    # Listado compacto: una linea por comentario, agrupado por sentimiento
+    def add_tabla_comentarios(self, grupos, total_por_grupo):
+        self.chapter_title("Comentarios de ejemplo")
+        for sentiment, comentarios in grupos.items():
+            self.set_font("Arial", "B", 11)
+            self.set_text_color(*color_sentimiento(sentiment))
+            self.cell(0, 8, f"{sentiment} ({len(comentarios)} de {total_por_grupo[sentiment]})", 0, 1)
+            self.set_text_color(0, 0, 0)
+            self.set_font("Arial", "", 9)
+            ancho = self.w - self.l_margin - self.r_margin - 12
+            for index, comentario in comentarios:
+                self.cell(12, 5, f"#{index}", 0, 0)
+                self.cell(0, 5, recortar_texto(self, texto_pdf(comentario['comment']), ancho), 0, 1)
+            self.ln(3)
+
+    def add_problemas(self, agregado):
+        self.chapter_title("Problemas más frecuentes")
+        self.set_font("Arial", "", 11)
+        for categoria, cantidad in agregado['total']:
+            self.cell(150, 8, texto_pdf(f"        {categoria}"), 0, 0)
+            self.cell(0, 8, str(cantidad), 0, 1, "R")
+        self.ln(5)
+        for titulo, grupos in (("Por sentimiento", agregado['por_sentimiento']), ("Por nota de recomendación", agregado['por_banda'])):
+            self.chapter_title(titulo)
+            for grupo, problemas in sorted(grupos.items()):
+                self.set_font("Arial", "B", 11)
+                self.cell(0, 8, texto_pdf(f"    {grupo}"), 0, 1)
+                self.set_font("Arial", "", 11)
+                for categoria, cantidad in problemas[:5]:
+                    self.cell(150, 8, texto_pdf(f"        {categoria}"), 0, 0)
+                    self.cell(0, 8, str(cantidad), 0, 1, "R")
+            self.ln(5)
+
+    def add_graphics(self, imagen):
+        # Si el grafico no entra en lo que queda de la pagina, se pasa a la siguiente
+        if not isinstance(imagen, str) and self.get_y() + 10 + 190 * imagen['h'] / imagen['w'] > self.page_break_trigger:
+            self.add_page()
+        self.imagen(imagen, x=10, y=self.get_y() + 10, w=190)
+
+# Sobre esta cantidad de comentarios el informe se arma en modo resumen
+LIMITE_COMENTARIOS_COMPLETO = 200
+
+# modo 'completo' lista cada comentario con su sentimiento y problemas;
+# modo 'resumen' muestra tablas agregadas y como mucho max_por_grupo comentarios
+# por sentimiento (elegidos al azar con semilla fija), asi el tiempo y el tamaño del PDF no
+# depende de la cantidad de comentarios
+def escribir_seccion_comentarios(pdf, comments, modo=None, max_por_grupo=10):
+    if modo is None:
+        modo = 'completo' if len(comments) <= LIMITE_COMENTARIOS_COMPLETO else 'resumen'
+
+    # Contar la frecuencia de cada sentimiento (en modo resumen se guarda una
+    # muestra de tamaño fijo por sentimiento, con muestreo de reservorio)
+    sentiment_counts = {'Negativo': 0, 'Positivo': 0, 'Neutro': 0}
+    muestras = {sentiment: [] for sentiment in sentiment_counts}
+    azar = random.Random(0)
+    for index, comment_data in enumerate(comments, start=1):
+        sentiment = comment_data['sentiment'].capitalize()
+        if sentiment not in sentiment_counts:
+            sentiment = 'Neutro'
+        sentiment_counts[sentiment] += 1
+        if modo == 'completo':
+            pdf.add_comment(index, comment_data['comment'], comment_data['sentiment'], comment_data['problems'])
+        elif len(muestras[sentiment]) < max_por_grupo:
+            muestras[sentiment].append((index, comment_data))
+        else:
+            posicion = azar.randrange(sentiment_counts[sentiment])
+            if posicion < max_por_grupo:
+                muestras[sentiment][posicion] = (index, comment_data)
+
+    if modo == 'resumen':
+        pdf.add_resumen_sentimientos(sentiment_counts)
+        pdf.add_tabla_comentarios({sentiment: sorted(muestra, key=lambda item: item[0]) for sentiment, muestra in muestras.items() if muestra}, sentiment_counts)
+
+    # Problemas agrupados por categoria
+    pdf.add_problemas(agregar_problemas(comments))
+
+    # Gráfico de pastel (sin comentarios, ej. una ventana de fechas vacia, no hay torta)
+    fig = obtener_figura('sentimientos', (8, 6))
+    ax = fig.add_subplot()
+    if sum(sentiment_counts.values()):
+        ax.pie(sentiment_counts.values(), labels=sentiment_counts.keys(), autopct='%1.1f%%', startangle=140)
+    else:
+        pdf.chapter_body("Sin comentarios en el periodo seleccionado.")
+        sin_datos(ax, 'Sin comentarios')
+    ax.set_title("Distribución de Sentimientos en el informe")
+
+    # Añadir el gráfico al PDF
+    pdf.add_graphics(figura_a_imagen(fig))
+
+def create_pdf(comments, filename, modo=None, max_por_grupo=10):
+    pdf = PDFComentarios()
+    pdf.add_page()
+    escribir_seccion_comentarios(pdf, comments, modo, max_por_grupo)
+
+    # Guardar el PDF
+    escribir_pdf(pdf, filename)
+    logger.info("Informe de ChatGPT PDF creado exitosamente.")
+    return pdf
+
+### Informe completo en un solo documento ###
+
+# Documento unico con las dos secciones: cada seccion usa el estilo de su PDF
+# original y su titulo se imprime en la primera pagina de la seccion
+class PDFInforme(ImagenesEnMemoria, FPDF):
+    TITULOS = {
+        'metricas': 'Informe de la Encuesta',
+        'segmentos': 'Métricas por segmento',
+        'comentarios': 'Informe sobre las respuestas abiertas',
+    }
+
+    def __init__(self):
+        super().__init__()
+        self.seccion = None
+        self.titulo_pendiente = False
+
+    def nueva_seccion(self, seccion):
+        self.seccion = seccion
+        self.titulo_pendiente = True
+        self.add_page()
+
+    def _estilo(self):
+        return PDFComentarios if self.seccion == 'comentarios' else PDFMetricas
+
+    def header(self):
+        if self.titulo_pendiente:
+            self.set_font("Arial", "B", 16)
+            self.cell(0, 10, self.TITULOS[self.seccion], 0, 1, "C")
+            self.titulo_pendiente = False
+            if self.seccion == 'comentarios':
+                self.ln(10)
+
+    def chapter_title(self, title):
+        self._estilo().chapter_title(self, title)
+
+    def chapter_body(self, body):
+        self._estilo().chapter_body(self, body)
+
+    def add_graphics(self, imagen):
+        self._estilo().add_graphics(self, imagen)
+
+    add_tabla = PDFMetricas.add_tabla
+    add_comment = PDFComentarios.add_comment
+    add_resumen_sentimientos = PDFComentarios.add_resumen_sentimientos
+    add_tabla_comentarios = PDFComentarios.add_tabla_comentarios
+    add_problemas = PDFComentarios.add_problemas
+
+# Arma el informe completo en una sola pasada (sin escribir y volver a leer los PDF
+# de cada seccion). destino puede ser una ruta o un stream binario (ej. sys.stdout.buffer)
+def generar_informe_completo(resultado, comments, destino='Informe_completo.pdf', modo=None, max_por_grupo=10,
+                             segmentos=None, dimensiones=(), periodo=None):
+    pdf = PDFInforme()
+    if resultado is not None:
+        pdf.nueva_seccion('metricas')
+        escribir_seccion_metricas(pdf, resultado)
+    if segmentos is not None and len(segmentos):
+        pdf.nueva_seccion('segmentos')
+        escribir_seccion_segmentos(pdf, segmentos, dimensiones, periodo)
+    if comments:
+        pdf.nueva_seccion('comentarios')
+        escribir_seccion_comentarios(pdf, comments, modo, max_por_grupo)
+    escribir_pdf(pdf, destino)
+    return pdf
+
+# Funcion para unir ambos informes en un pdf (a partir de los PDF de cada seccion)
+def merge_pdfs(input_pdfs, output_pdf):
+    # PyPDF2 solo hace falta para unir PDF ya generados
+    import PyPDF2
+    merger = PyPDF2.PdfMerger()
+
+    with instrumentacion.etapa('unir_pdfs'):
+        for pdf in input_pdfs:
+            merger.append(pdf)
+
+        merger.write(output_pdf)
+        merger.close()
@@ -0,0 +1,137 @@
+""" Registro (logging) e instrumentacion por etapa """
+import contextlib
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+logger = logging.getLogger('encuesta')
+
+# Formato JSON de una linea por evento; los datos extra van en extra={'datos': {...}}
+class FormatoJSON(logging.Formatter):
+    def format(self, record):
+        evento = {
+            'fecha': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'nivel': record.levelname,
+            'mensaje': record.getMessage(),
+        }
+        evento.update(getattr(record, 'datos', {}))
+        if record.exc_info:
+            evento['error'] = self.formatException(record.exc_info)
+        return json.dumps(evento, ensure_ascii=False, default=str)
+
+# Los mensajes van a stderr (stdout queda libre para el PDF con --salida=-)
+def configurar_logging(formato_json=False, nivel=logging.INFO):
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(FormatoJSON() if formato_json else logging.Formatter('%(message)s'))
+    logger.handlers[:] = [handler]
+    logger.setLevel(nivel)
+    logger.propagate = False
+
+# Memoria residente pico del proceso (en Linux ru_maxrss viene en KB); None donde no existe
+# el modulo resource (Windows)
+def _rss_pico_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+# Tiempos por etapa, contadores (filas, bytes, paginas) y, opcionalmente, memoria pico
+# (tracemalloc) y perfil (cProfile). Apagada, etapa() devuelve siempre el mismo
+# contexto vacio y contar() solo compara un booleano
+class Instrumentacion:
+    def __init__(self):
+        self.activa = False
+        self.memoria = False
+        self.perfil = None
+        self.etapas = {}
+        self.contadores = {}
+        self._nula = contextlib.nullcontext()
+        self._profundidad = 0
+        self._inicio = None
+
+    def activar(self, memoria=False, perfil=False):
+        self.activa = True
+        self._inicio = time.perf_counter()
+        if memoria:
+            self.memoria = True
+            tracemalloc.start()
+        if perfil:
+            import cProfile
+            self.perfil = cProfile.Profile()
+            self.perfil.enable()
+
+    def etapa(self, nombre):
+        if not self.activa:
+            return self._nula
+        return self._medir(nombre)
+
+    @contextlib.contextmanager
+    def _medir(self, nombre):
+        # La memoria pico se mide solo en las etapas de primer nivel (las anidadas comparten el pico)
+        principal = self._profundidad == 0
+        if self.memoria and principal:
+            tracemalloc.reset_peak()
+        self._profundidad += 1
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            segundos = time.perf_counter() - inicio
+            self._profundidad -= 1
+            etapa = self.etapas.setdefault(nombre, {'llamadas': 0, 'segundos': 0.0})
+            etapa['llamadas'] += 1
+            etapa['segundos'] += segundos
+            if self.memoria and principal:
+                pico = tracemalloc.get_traced_memory()[1] / 2 ** 20
+                etapa['memoria_pico_mb'] = max(etapa.get('memoria_pico_mb', 0.0), pico)
+
+    def contar(self, nombre, valor=1):
+        if self.activa:
+            self.contadores[nombre] = self.contadores.get(nombre, 0) + valor
+
+    def informe(self, consultas=None):
+        informe = {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'argumentos': sys.argv[1:],
+            'segundos_total': time.perf_counter() - self._inicio if self._inicio else None,
+            'rss_pico_mb': _rss_pico_mb(),
+            'etapas': self.etapas,
+            'contadores': self.contadores,
+            'consultas': consultas or {},
+        }
+        if self.perfil is not None:
+            import pstats
+            self.perfil.disable()
+            estadisticas = pstats.Stats(self.perfil)
+            funciones = sorted(estadisticas.stats.items(), key=lambda item: item[1][3], reverse=True)[:30]
+            informe['perfil'] = [
+                {'funcion': f"{archivo}:{linea}({nombre})", 'llamadas': llamadas, 'segundos_propios': propios, 'segundos_acumulados': acumulados}
+                for (archivo, linea, nombre), (_, llamadas, propios, acumulados, _) in funciones
+            ]
+        return informe
+
+    # Guarda el informe de la corrida en JSON y en formato de texto de OpenMetrics
+    def guardar_informe(self, path, consultas=None):
+        informe = self.informe(consultas)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, ensure_ascii=False, indent=2, default=str)
+        lineas = ['# TYPE encuesta_etapa_segundos gauge']
+        lineas += [f'encuesta_etapa_segundos{{etapa="{nombre}"}} {etapa["segundos"]:.6f}' for nombre, etapa in self.etapas.items()]
+        lineas.append('# TYPE encuesta_etapa_llamadas counter')
+        lineas += [f'encuesta_etapa_llamadas_total{{etapa="{nombre}"}} {etapa["llamadas"]}' for nombre, etapa in self.etapas.items()]
+        lineas.append('# TYPE encuesta_contador counter')
+        lineas += [f'encuesta_contador_total{{nombre="{nombre}"}} {valor}' for nombre, valor in self.contadores.items()]
+        if informe['rss_pico_mb'] is not None:
+            lineas.append('# TYPE encuesta_rss_pico_mb gauge')
+            lineas.append(f"encuesta_rss_pico_mb {informe['rss_pico_mb']:.2f}")
+        lineas.append('# EOF')
+        with open(os.path.splitext(path)[0] + '.prom', 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lineas) + '\n')
+        return informe
+
+instrumentacion = Instrumentacion()
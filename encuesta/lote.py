@@ -0,0 +1,95 @@
+""" Informes por lote (varios proyectos en paralelo) """
+import hashlib
+import json
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from . import conexion
+from .conexion import ErrorConexion, connectDB
+from .datos import TABLA
+from .informes import generar_informe_metricas
+from .instrumentacion import logger
+from .metricas import BACKENDS_METRICAS, calcular_metricas_incremental
+
+# Cada fuente es un dict con 'nombre' y opcionalmente 'tabla', 'filtro' y 'params'
+def fuentes_por_segmento(columna, tabla=TABLA):
+    conn, cursor = connectDB()
+    if not (conn and cursor):
+        return []
+    try:
+        cursor.execute(f"SELECT DISTINCT {columna} FROM {tabla} WHERE {columna} IS NOT NULL")
+        valores = [fila[0] for fila in cursor.fetchall()]
+    finally:
+        cursor.close()
+        conn.close()
+    return [{'nombre': str(valor), 'tabla': tabla, 'filtro': f"{columna} = %s", 'params': [valor]} for valor in sorted(valores)]
+
+# Nombre de los archivos (PDF y estado) de una fuente: el nombre legible mas un hash corto de
+# la fuente completa, asi "Norte/Sur" y "Norte Sur" (o dos filtros con el mismo nombre) no
+# comparten archivos. Es estable entre corridas, el estado incremental se sigue encontrando
+def _nombre_archivo(fuente):
+    nombre = re.sub(r'[^\w.-]+', '_', str(fuente['nombre'])).strip('_') or 'encuesta'
+    clave = json.dumps([str(fuente['nombre']), fuente.get('tabla', TABLA), fuente.get('filtro'), list(fuente.get('params', ()))],
+                       default=str)
+    return f"{nombre}_{hashlib.sha256(clave.encode('utf-8')).hexdigest()[:8]}"
+
+# Los procesos hijos no deben reutilizar las conexiones abiertas por el proceso padre
+def _iniciar_worker():
+    conexion._pool = None
+
+# Trabajo de un proyecto: metricas, graficos y PDF con rutas propias
+def generar_informe_proyecto(fuente, directorio='informes', backend='pandas', incremental=False):
+    inicio = time.perf_counter()
+    nombre = _nombre_archivo(fuente)
+    pdf_path = os.path.join(directorio, f"Informe_encuesta_{nombre}.pdf")
+    job = {'nombre': fuente['nombre'], 'pdf': pdf_path, 'ok': False, 'error': None}
+    try:
+        conn, cursor = connectDB()
+        if not (conn and cursor):
+            raise ErrorConexion("No se pudo establecer la conexión a la base de datos")
+        try:
+            tabla = fuente.get('tabla', TABLA)
+            filtro, params = fuente.get('filtro'), tuple(fuente.get('params', ()))
+            if incremental:
+                estado_path = os.path.join(directorio, f"estado_{nombre}.json")
+                resultado = calcular_metricas_incremental(cursor, estado_path, backend, filtro, params, tabla)
+            else:
+                resultado = BACKENDS_METRICAS[backend](cursor, filtro, params, tabla=tabla).result()
+        finally:
+            cursor.close()
+            conn.close()
+        generar_informe_metricas(resultado, pdf_path)
+        job['ok'] = True
+        job['total_respuestas'] = resultado['total_respuestas']
+    except Exception as e:
+        job['error'] = f"{type(e).__name__}: {e}"
+    job['segundos'] = time.perf_counter() - inicio
+    return job
+
+# Las fuentes repetidas se rechazan antes de empezar: escribirian el mismo PDF (y el mismo estado)
+def generar_informes_lote(fuentes, directorio='informes', backend='pandas', workers=None, incremental=False):
+    repetidas = sorted(nombre for nombre, cantidad in Counter(_nombre_archivo(fuente) for fuente in fuentes).items() if cantidad > 1)
+    if repetidas:
+        raise ValueError(f"Fuentes repetidas en el lote: {', '.join(repetidas)}")
+    os.makedirs(directorio, exist_ok=True)
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_worker) as executor:
+        futuros = [executor.submit(generar_informe_proyecto, fuente, directorio, backend, incremental) for fuente in fuentes]
+        jobs = [futuro.result() for futuro in futuros]
+    resumen = {
+        'segundos': time.perf_counter() - inicio,
+        'ok': sum(job['ok'] for job in jobs),
+        'fallidos': sum(not job['ok'] for job in jobs),
+        'jobs': jobs,
+    }
+    with open(os.path.join(directorio, 'resumen_lote.json'), 'w', encoding='utf-8') as f:
+        json.dump(resumen, f, ensure_ascii=False, indent=2)
+    for job in jobs:
+        estado = 'OK' if job['ok'] else f"ERROR ({job['error']})"
+        logger.info(f"{job['nombre']}: {job['segundos']:.2f}s {estado}", extra={'datos': job})
+    logger.info(f"Lote terminado en {resumen['segundos']:.2f}s: {resumen['ok']} informes, {resumen['fallidos']} fallidos",
+                extra={'datos': {'segundos': resumen['segundos'], 'ok': resumen['ok'], 'fallidos': resumen['fallidos']}})
+    return resumen
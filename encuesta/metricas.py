@@ -0,0 +1,334 @@
+""" Metricas de la encuesta: acumulador por lotes, backends pandas/SQL y modo incremental """
+import json
+import os
+from datetime import datetime
+
+from .datos import CHUNK_SIZE, COLUMNA_ID, COLUMNAS_METRICAS, FORMATO_FECHA, TABLA, es_nulo, fetch_data_chunks
+from .distribuciones import TDigest, resumen_histograma
+from .instrumentacion import instrumentacion
+
+# Las metricas no importan pandas: el backend SQL las calcula sin cargarlo
+# y los lotes del backend pandas ya traen sus propios metodos
+
+# SNG de satisfaccion
+def satisfaccion_sng(data, column):
+    promotores = data[data[column] >= 6].shape[0]
+    detractores = data[data[column] <= 3].shape[0]
+    total_respuestas = data.shape[0]
+    sng = ((promotores - detractores) / total_respuestas) * 100
+    return sng
+
+# Total de personas que conocian la empresa
+def total_conocia_empresa(data):
+    conocia_empresa = data[data['conocia_empresa'] == 'Sí'].shape[0]
+    return conocia_empresa
+
+# SNG recomendaciones
+def recomendacion_sng(data, column):
+    promotores = data[data[column] >= 6].shape[0]
+    detractores = data[data[column] <= 3].shape[0]
+    total_respuestas = data.shape[0]
+    sng = ((promotores - detractores) / total_respuestas) * 100
+    return sng
+
+# SNG promedio de recomendaciones
+def promedio_recomendacion(data, column):
+    return data[column].mean()
+
+# Total de comentarios
+def total_comentarios(data, columna_comentario):
+    total_comentarios = data[columna_comentario].dropna().shape[0]
+    return total_comentarios
+
+# Dias, meses (de 30 dias) y dias restantes entre la primera y la ultima respuesta
+def duracion_encuesta(fecha_inicio, fecha_fin):
+    if es_nulo(fecha_inicio) or es_nulo(fecha_fin):
+        return None, None, None
+    dias_transcurridos = (fecha_fin - fecha_inicio).days
+    meses_transcurridos = dias_transcurridos // 30 # Considero 30 días por mes
+    dias_restantes = dias_transcurridos % 30
+    return dias_transcurridos, meses_transcurridos, dias_restantes
+
+# Duracion de encuesta (solo hace falta el minimo y el maximo: si la columna ya es
+# datetime64, como al leerla con fetch_data, no se vuelve a convertir)
+def calcular_duracion_encuesta(data):
+    if 'fecha' not in data.columns:
+        return None, None, None
+    import pandas as pd
+    fechas = data['fecha']
+    if not pd.api.types.is_datetime64_any_dtype(fechas):
+        fechas = pd.to_datetime(fechas, format=FORMATO_FECHA, errors='coerce')
+    return duracion_encuesta(fechas.min(), fechas.max())
+
+# Acumulador de metricas: recibe lotes (o la tabla completa) y calcula todo en una sola pasada.
+# Los resultados parciales se pueden combinar con merge (lotes leidos en paralelo).
+# Las notas se acumulan en histogramas exactos (de ahi salen mediana, p10 y p90) y el
+# tiempo entre respuestas, que no tiene escala fija, en un t-digest
+class MetricasEncuesta:
+    def __init__(self):
+        self.total = 0
+        self.histograma_satisfaccion = {}
+        self.histograma_recomendacion = {}
+        self.suma_recomendacion = 0
+        self.cantidad_recomendacion = 0
+        self.conocian = 0
+        self.comentarios = 0
+        self.fecha_min = None
+        self.fecha_max = None
+        self.ultimo_id = None
+        self.tiempo_entre_respuestas = TDigest()
+        # False si alguna parte se calculo sin los tiempos (backend SQL): el digest ya no
+        # representa todas las filas y no se informa
+        self.tiempos_completos = True
+
+    @staticmethod
+    def _sumar_histograma(histograma, conteos):
+        for valor, cantidad in conteos.items():
+            valor = int(valor)
+            histograma[valor] = histograma.get(valor, 0) + int(cantidad)
+
+    def _actualizar_fechas(self, fecha_min, fecha_max):
+        if not es_nulo(fecha_min):
+            if self.fecha_min is None or fecha_min < self.fecha_min:
+                self.fecha_min = fecha_min
+        if not es_nulo(fecha_max):
+            if self.fecha_max is None or fecha_max > self.fecha_max:
+                self.fecha_max = fecha_max
+
+    def _actualizar_ultimo_id(self, ultimo_id):
+        if not es_nulo(ultimo_id):
+            if self.ultimo_id is None or ultimo_id > self.ultimo_id:
+                self.ultimo_id = int(ultimo_id)
+
+    # Segundos entre respuestas consecutivas (por fecha) del lote, mas el salto desde la ultima
+    # fecha ya vista. Es exacto si los lotes llegan ordenados por fecha (como al leer la tabla
+    # por id); merge suma el salto entre particiones si la nueva empieza despues de la anterior
+    # (corridas incrementales), si no se pierde
+    def _actualizar_tiempos(self, fechas):
+        fechas = fechas.dropna().sort_values()
+        if not len(fechas):
+            return
+        conteos = fechas.diff().dt.total_seconds().iloc[1:].value_counts()
+        valores, pesos = list(conteos.index), list(conteos.values)
+        if self.fecha_max is not None and fechas.iloc[0] >= self.fecha_max:
+            valores.append((fechas.iloc[0] - self.fecha_max).total_seconds())
+            pesos.append(1)
+        self.tiempo_entre_respuestas.agregar(valores, pesos)
+
+    def update(self, chunk):
+        with instrumentacion.etapa('acumular_metricas'):
+            return self._update(chunk)
+
+    def _update(self, chunk):
+        self.total += len(chunk)
+        self._sumar_histograma(self.histograma_satisfaccion, chunk['satisfeccion_general'].value_counts())
+        self._sumar_histograma(self.histograma_recomendacion, chunk['recomendacion'].value_counts())
+        self.suma_recomendacion += int(chunk['recomendacion'].sum())
+        self.cantidad_recomendacion += int(chunk['recomendacion'].count())
+        self.conocian += int((chunk['conocia_empresa'] == 'Sí').sum())
+        self.comentarios += int(chunk['recomendacion_abierta'].count())
+        if 'fecha' in chunk.columns and len(chunk):
+            self._actualizar_tiempos(chunk['fecha'])
+            self._actualizar_fechas(chunk['fecha'].min(), chunk['fecha'].max())
+        if COLUMNA_ID in chunk.columns and len(chunk):
+            self._actualizar_ultimo_id(chunk[COLUMNA_ID].max())
+        return self
+
+    def merge(self, other):
+        if self.fecha_max is not None and other.fecha_min is not None and other.fecha_min >= self.fecha_max:
+            self.tiempo_entre_respuestas.agregar([(other.fecha_min - self.fecha_max).total_seconds()])
+        self.total += other.total
+        self._sumar_histograma(self.histograma_satisfaccion, other.histograma_satisfaccion)
+        self._sumar_histograma(self.histograma_recomendacion, other.histograma_recomendacion)
+        self.suma_recomendacion += other.suma_recomendacion
+        self.cantidad_recomendacion += other.cantidad_recomendacion
+        self.conocian += other.conocian
+        self.comentarios += other.comentarios
+        self._actualizar_fechas(other.fecha_min, other.fecha_max)
+        self._actualizar_ultimo_id(other.ultimo_id)
+        self.tiempos_completos = self.tiempos_completos and other.tiempos_completos
+        if self.tiempos_completos:
+            self.tiempo_entre_respuestas.merge(other.tiempo_entre_respuestas)
+        else:
+            self.tiempo_entre_respuestas = TDigest()
+        return self
+
+    # Estado serializable (para guardarlo entre corridas)
+    def to_dict(self):
+        return {
+            'total': self.total,
+            'histograma_satisfaccion': self.histograma_satisfaccion,
+            'histograma_recomendacion': self.histograma_recomendacion,
+            'suma_recomendacion': self.suma_recomendacion,
+            'cantidad_recomendacion': self.cantidad_recomendacion,
+            'conocian': self.conocian,
+            'comentarios': self.comentarios,
+            'fecha_min': self.fecha_min.isoformat() if self.fecha_min is not None else None,
+            'fecha_max': self.fecha_max.isoformat() if self.fecha_max is not None else None,
+            'ultimo_id': self.ultimo_id,
+            'tiempo_entre_respuestas': self.tiempo_entre_respuestas.to_dict(),
+            'tiempos_completos': self.tiempos_completos,
+        }
+
+    @classmethod
+    def from_dict(cls, estado):
+        metricas = cls()
+        metricas.total = estado['total']
+        # JSON guarda las claves como texto
+        metricas.histograma_satisfaccion = {int(valor): cantidad for valor, cantidad in estado['histograma_satisfaccion'].items()}
+        metricas.histograma_recomendacion = {int(valor): cantidad for valor, cantidad in estado['histograma_recomendacion'].items()}
+        metricas.suma_recomendacion = estado['suma_recomendacion']
+        metricas.cantidad_recomendacion = estado['cantidad_recomendacion']
+        metricas.conocian = estado['conocian']
+        metricas.comentarios = estado['comentarios']
+        metricas.fecha_min = datetime.fromisoformat(estado['fecha_min']) if estado['fecha_min'] else None
+        metricas.fecha_max = datetime.fromisoformat(estado['fecha_max']) if estado['fecha_max'] else None
+        metricas.ultimo_id = estado['ultimo_id']
+        # Los estados guardados antes de medir el tiempo entre respuestas no lo traen
+        if 'tiempo_entre_respuestas' in estado:
+            metricas.tiempo_entre_respuestas = TDigest.from_dict(estado['tiempo_entre_respuestas'])
+        metricas.tiempos_completos = estado.get('tiempos_completos', True)
+        return metricas
+
+    # SNG a partir del histograma: promotores (>= 6) menos detractores (<= 3)
+    def _sng(self, histograma):
+        if not self.total:
+            return 0.0
+        promotores = sum(cantidad for valor, cantidad in histograma.items() if valor >= 6)
+        detractores = sum(cantidad for valor, cantidad in histograma.items() if valor <= 3)
+        return ((promotores - detractores) / self.total) * 100
+
+    # Actividad: respuestas por dia calendario cubierto y dias desde la ultima respuesta
+    def _actividad(self, ahora=None):
+        if self.fecha_min is None or self.fecha_max is None:
+            return None, None
+        dias_cubiertos = (self.fecha_max.date() - self.fecha_min.date()).days + 1
+        return self.total / dias_cubiertos, ((ahora or datetime.now()) - self.fecha_max).days
+
+    def result(self):
+        dias, meses, dias_restantes = duracion_encuesta(self.fecha_min, self.fecha_max)
+        respuestas_por_dia, dias_desde_ultima = self._actividad()
+        promedio = self.suma_recomendacion / self.cantidad_recomendacion if self.cantidad_recomendacion else None
+        return {
+            'total_respuestas': self.total,
+            'sng_satisfaccion': self._sng(self.histograma_satisfaccion),
+            'sng_recomendacion': self._sng(self.histograma_recomendacion),
+            'promedio_recomendacion': promedio,
+            'total_conocian': self.conocian,
+            'total_comentarios': self.comentarios,
+            'histograma_satisfaccion': dict(sorted(self.histograma_satisfaccion.items())),
+            'histograma_recomendacion': dict(sorted(self.histograma_recomendacion.items())),
+            'distribucion_satisfaccion': resumen_histograma(self.histograma_satisfaccion),
+            'distribucion_recomendacion': resumen_histograma(self.histograma_recomendacion),
+            # Segundos (p10, mediana, p90, minimo, maximo y cantidad); None sin fechas o con el backend
+            # SQL (tambien si un estado incremental ya sumo alguna corrida con ese backend)
+            'tiempo_entre_respuestas': self.tiempo_entre_respuestas.resumen() if self.tiempos_completos else None,
+            'fecha_inicio': self.fecha_min,
+            'fecha_fin': self.fecha_max,
+            'dias_encuesta': dias,
+            'meses_encuesta': meses,
+            'dias_restantes': dias_restantes,
+            'respuestas_por_dia': respuestas_por_dia,
+            'dias_desde_ultima_respuesta': dias_desde_ultima,
+        }
+
+# Acumula las metricas de un iterable de lotes (de la base o de un snapshot, ver lotes())
+def acumular_metricas(chunks):
+    metricas = MetricasEncuesta()
+    for chunk in chunks:
+        metricas.update(chunk)
+    return metricas
+
+# Calcula todas las metricas a partir de un iterable de lotes
+def calcular_metricas(chunks):
+    return acumular_metricas(chunks).result()
+
+# Backends de metricas: ambos devuelven un MetricasEncuesta con el mismo contenido.
+# "pandas" trae las filas por lotes y las acumula en Python; "sql" resuelve todo con
+# consultas de agregacion en la base y solo viaja el resultado
+def metricas_pandas(cursor, filtro=None, params=(), chunk_size=CHUNK_SIZE, tabla=TABLA):
+    columnas = COLUMNAS_METRICAS + [COLUMNA_ID] if COLUMNA_ID else COLUMNAS_METRICAS
+    return acumular_metricas(fetch_data_chunks(cursor, chunk_size, columnas, filtro, params, tabla=tabla))
+
+# MySQL devuelve datetime y SQLite el texto de la fecha
+def _a_fecha(valor):
+    if valor is None or isinstance(valor, datetime):
+        return valor
+    return datetime.fromisoformat(str(valor))
+
+def metricas_sql(cursor, filtro=None, params=(), chunk_size=None, tabla=TABLA):
+    where = f" WHERE {filtro}" if filtro else ""
+    ultimo_id = f"MAX({COLUMNA_ID})" if COLUMNA_ID else "NULL"
+    cursor.execute(
+        "SELECT COUNT(*), SUM(recomendacion), COUNT(recomendacion), "
+        "SUM(CASE WHEN conocia_empresa = 'Sí' THEN 1 ELSE 0 END), COUNT(recomendacion_abierta), "
+        f"MIN(fecha), MAX(fecha), {ultimo_id} FROM {tabla}{where}",
+        params,
+    )
+    total, suma, cantidad, conocian, comentarios, fecha_min, fecha_max, maximo_id = cursor.fetchone()
+
+    metricas = MetricasEncuesta()
+    metricas.total = int(total)
+    metricas.suma_recomendacion = int(suma or 0)
+    metricas.cantidad_recomendacion = int(cantidad)
+    metricas.conocian = int(conocian or 0)
+    metricas.comentarios = int(comentarios)
+    metricas._actualizar_fechas(
+        _a_fecha(fecha_min),
+        _a_fecha(fecha_max),
+    )
+    metricas._actualizar_ultimo_id(maximo_id)
+    # Los tiempos entre respuestas no se calculan en la base
+    metricas.tiempos_completos = not metricas.total
+
+    for column, histograma in (('satisfeccion_general', metricas.histograma_satisfaccion),
+                               ('recomendacion', metricas.histograma_recomendacion)):
+        cursor.execute(
+            f"SELECT {column}, COUNT(*) FROM {tabla}{where} GROUP BY {column}",
+            params,
+        )
+        metricas._sumar_histograma(histograma, {valor: cantidad for valor, cantidad in cursor.fetchall() if valor is not None})
+    return metricas
+
+BACKENDS_METRICAS = {
+    'pandas': metricas_pandas,
+    'sql': metricas_sql,
+}
+
+
+# Modo incremental: el estado acumulado se guarda en un archivo local y en cada corrida
+# solo se consultan las filas nuevas (id mayor al ultimo visto, o fecha posterior si no hay id).
+# Las filas modificadas o borradas despues de procesadas no se reflejan: para eso hay que
+# borrar el archivo de estado y recalcular todo. Una corrida con el backend SQL deja el
+# estado sin tiempo entre respuestas (hasta recalcular todo con pandas).
+ARCHIVO_ESTADO = 'estado_encuesta.json'
+
+def cargar_estado(path=ARCHIVO_ESTADO):
+    if not os.path.exists(path):
+        return MetricasEncuesta()
+    with open(path, encoding='utf-8') as f:
+        return MetricasEncuesta.from_dict(json.load(f))
+
+def guardar_estado(metricas, path=ARCHIVO_ESTADO):
+    # Se escribe a un temporal y se reemplaza, para no dejar un estado a medias
+    temporal = f"{path}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(metricas.to_dict(), f)
+    os.replace(temporal, path)
+
+# Los lotes de pandas dejan pd.Timestamp; los drivers esperan datetime
+def _fecha_python(fecha):
+    return fecha.to_pydatetime() if hasattr(fecha, 'to_pydatetime') else fecha
+
+def calcular_metricas_incremental(cursor, path=ARCHIVO_ESTADO, backend='pandas', filtro=None, params=(), tabla=TABLA):
+    metricas = cargar_estado(path)
+    if COLUMNA_ID:
+        marca, valor = COLUMNA_ID, metricas.ultimo_id
+    else:
+        marca, valor = 'fecha', _fecha_python(metricas.fecha_max)
+    if valor is not None:
+        filtro = f"({filtro}) AND {marca} > %s" if filtro else f"{marca} > %s"
+        params = tuple(params) + (valor,)
+    metricas.merge(BACKENDS_METRICAS[backend](cursor, filtro, params, tabla=tabla))
+    guardar_estado(metricas, path)
+    return metricas.result()
@@ -0,0 +1,101 @@
+""" Orquestacion de una corrida: metricas, segmentos y comentarios desde la base o un snapshot """
+from .conexion import ErrorConexion, connectDB, estadisticas_consultas
+from .datos import COLUMNA_ID, COLUMNAS_METRICAS, filtrar_ventana, filtro_ventana, lotes
+from .instrumentacion import instrumentacion, logger
+from .metricas import BACKENDS_METRICAS, calcular_metricas, calcular_metricas_incremental
+
+# Los modulos que cargan pandas, matplotlib o fpdf se importan dentro de cada funcion,
+# asi "metrics" con el backend SQL no los carga
+
+# Columnas que se leen del snapshot para los comentarios (la fecha es para la ventana)
+COLUMNAS_COMENTARIOS = ['recomendacion', 'recomendacion_abierta', 'fecha'] + ([COLUMNA_ID] if COLUMNA_ID else [])
+
+# Tabla de la encuesta desde el snapshot local (con las columnas de las dimensiones pedidas).
+# Para las metricas el texto de los comentarios no se decodifica, alcanza con su mascara de
+# nulos; con comentarios=True se leen solo las columnas de los comentarios, con su texto.
+# Las dos lecturas usan el mismo snapshot si se pasan las mismas dimensiones
+def cargar_dataset(cache, dimensiones=(), refrescar=False, comentarios=False):
+    from .snapshots import obtener_dataset
+    columnas = COLUMNAS_METRICAS + ([COLUMNA_ID] if COLUMNA_ID else [])
+    columnas += [dimension for dimension in dimensiones if dimension not in columnas]
+    if comentarios:
+        return obtener_dataset(cache, columnas, refrescar=refrescar, cargar=COLUMNAS_COMENTARIOS)
+    return obtener_dataset(cache, columnas, refrescar=refrescar, solo_nulos=['recomendacion_abierta'])
+
+# Metricas (y metricas por segmento si se piden dimensiones o periodo).
+# Con cache se usa el snapshot local y las metricas se calculan con pandas sobre el;
+# no aplica al modo incremental ni con filtro. ventana es (desde, hasta) de ventana_fechas:
+# en la base se agrega como rango sobre fecha y en el snapshot se filtran sus filas.
+# Devuelve (resultado, segmentos, dataset); dataset es la tabla del snapshot ya filtrada, sin
+# el texto de los comentarios (None si se consulto la base) y resultado es None si no hubo conexion
+def calcular(backend='pandas', dimensiones=(), periodo=None, incremental=False, cache=None, refrescar=False,
+             filtro=None, params=(), ventana=None):
+    if incremental and ventana:
+        raise ValueError("El modo incremental no se puede combinar con una ventana de fechas")
+    resultado = segmentos = dataset = None
+    if cache is not None and not incremental and not filtro:
+        dataset = cargar_dataset(cache, dimensiones, refrescar)
+    if dataset is not None:
+        dataset = filtrar_ventana(dataset, ventana)
+        with instrumentacion.etapa('metricas'):
+            resultado = calcular_metricas(lotes(dataset))
+        if dimensiones or periodo:
+            from .segmentos import agrupar_segmentos
+            with instrumentacion.etapa('segmentos'):
+                segmentos = agrupar_segmentos(lotes(dataset), dimensiones, periodo)
+        return resultado, segmentos, dataset
+
+    filtro, params = filtro_ventana(ventana, filtro, params)
+    conn, cursor = connectDB()
+    if not (conn and cursor):
+        logger.error("No se pudo establecer la conexión a la base de datos.")
+        return None, None, None
+    try:
+        with instrumentacion.etapa('metricas'):
+            if incremental:
+                resultado = calcular_metricas_incremental(cursor, backend=backend, filtro=filtro, params=params)
+            else:
+                resultado = BACKENDS_METRICAS[backend](cursor, filtro, params).result()
+        if dimensiones or periodo:
+            from .segmentos import BACKENDS_SEGMENTOS
+            with instrumentacion.etapa('segmentos'):
+                segmentos = BACKENDS_SEGMENTOS[backend](cursor, dimensiones, periodo, filtro, params)
+    finally:
+        cursor.close()
+        conn.close()
+    return resultado, segmentos, None
+
+# Tiempos acumulados por consulta del pool del proceso (al final de una corrida de la linea
+# de comandos; el servicio HTTP los expone en /estadisticas en lugar de escribirlos en el log)
+def registrar_consultas():
+    for query, estadistica in estadisticas_consultas().items():
+        logger.info(f"{estadistica['segundos']:.3f}s, {estadistica['llamadas']} llamadas, {estadistica['filas']} filas: {query}",
+                    extra={'datos': dict(estadistica, query=query)})
+
+# Comentarios de la encuesta clasificados (del snapshot si se paso dataset, leido con
+# cargar_dataset(..., comentarios=True), si no de la base).
+# Sin base de datos se lanza ErrorConexion; con ejemplo=True se usa en cambio la lista de
+# ejemplo clasificada previamente con ChatGPT (nunca sin pedirlo: no son de esta encuesta)
+def obtener_comentarios(dataset=None, clasificador='lexico', filtro=None, params=(), ventana=None, ejemplo=False):
+    from .clasificacion import CLASIFICADORES, clasificar_comentarios, extraer_comentarios, leer_comentarios
+    comentarios = None
+    if dataset is not None:
+        with instrumentacion.etapa('leer_comentarios'):
+            comentarios = extraer_comentarios(lotes(filtrar_ventana(dataset, ventana)))
+    else:
+        conn, cursor = connectDB()
+        if conn and cursor:
+            try:
+                with instrumentacion.etapa('leer_comentarios'):
+                    comentarios = leer_comentarios(cursor, *filtro_ventana(ventana, filtro, params))
+            finally:
+                cursor.close()
+                conn.close()
+    if comentarios is None:
+        if not ejemplo:
+            raise ErrorConexion("No se pudo establecer la conexión a la base de datos para leer los comentarios")
+        logger.warning("Sin conexión a la base de datos: se usan los comentarios de ejemplo")
+        from .ejemplos import COMENTARIOS_EJEMPLO
+        return COMENTARIOS_EJEMPLO
+    with instrumentacion.etapa('clasificar_comentarios'):
+        return clasificar_comentarios(comentarios, CLASIFICADORES[clasificador]())
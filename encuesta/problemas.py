@@ -0,0 +1,175 @@
+""" Indice de problemas: agrupa etiquetas con distinta redaccion en categorias canonicas """
+import hashlib
+import re
+from itertools import chain
+
+import numpy as np
+
+from .clasificacion import normalizar_texto
+from .datos import es_nulo
+
+PALABRAS_VACIAS = {
+    'de', 'del', 'la', 'las', 'el', 'los', 'lo', 'en', 'y', 'e', 'o', 'a', 'al', 'por', 'para', 'con',
+    'un', 'una', 'muy', 'mas', 'que', 'se', 'su', 'sus', 'ninguno', 'ninguna',
+}
+
+# Raiz muy simple: saca plurales y la vocal final (estacionamientos -> estacionamient, lenta/lento -> lent)
+def _raiz(palabra):
+    if len(palabra) > 4 and palabra.endswith('s'):
+        palabra = palabra[:-1]
+    if len(palabra) > 4 and palabra[-1] in 'aeo':
+        palabra = palabra[:-1]
+    return palabra
+
+def normalizar_problema(etiqueta):
+    palabras = re.findall(r'\w+', normalizar_texto(etiqueta))
+    return tuple(sorted({_raiz(palabra) for palabra in palabras if palabra not in PALABRAS_VACIAS}))
+
+# Trigramas de caracteres de cada raiz (sin importar el orden de las palabras)
+def _trigramas(raices):
+    trigramas = set()
+    for raiz in raices:
+        raiz = f" {raiz} "
+        trigramas.update(raiz[inicio:inicio + 3] for inicio in range(len(raiz) - 2))
+    return trigramas
+
+# MinHash: cada trigrama pasa por FILAS * BANDAS funciones de hash fijas y la firma de una
+# etiqueta es el minimo de cada una. Dos etiquetas con similitud s coinciden en una banda
+# (FILAS valores seguidos) con probabilidad s ** FILAS, asi que con 100 bandas de 5 filas
+# una etiqueta con similitud 0.5 comparte alguna banda el 96% de las veces (0.6: 99.97%)
+# y una con similitud 0.2, solo el 3%
+FILAS, BANDAS = 5, 100
+PRIMO = (1 << 31) - 1
+_azar = np.random.default_rng(0)
+_A, _C = (_azar.integers(1, PRIMO, FILAS * BANDAS, dtype=np.int64) for _ in range(2))
+_MEZCLA = _azar.integers(1, PRIMO, FILAS, dtype=np.int64)
+
+# Cada etiqueta nueva se compara solo contra las categorias con las que comparte alguna banda
+# de la firma (a lo sumo MAX_CUBETA por banda), y las etiquetas ya vistas se resuelven desde un
+# diccionario: el costo por etiqueta casi no crece con la cantidad de categorias. Es aproximado, una
+# etiqueta con similitud apenas sobre el umbral puede quedar como categoria aparte
+class IndiceProblemas:
+    MAX_CUBETA = 256
+
+    def __init__(self, categorias=(), umbral=0.5):
+        self.umbral = umbral
+        self.categorias = []
+        self.comparaciones = 0
+        self._trigramas_categoria = []
+        self._hashes = {}
+        self._cubetas = {}
+        self._resueltas = {}
+        self._etiquetas = {}
+        for categoria in categorias:
+            self.categoria(categoria)
+
+    # Banda y valor de cada banda de la firma MinHash
+    def _bandas(self, trigramas):
+        hashes = []
+        for trigrama in trigramas:
+            if trigrama not in self._hashes:
+                valor = int.from_bytes(hashlib.blake2b(trigrama.encode('utf-8'), digest_size=8).digest(), 'little') % PRIMO
+                self._hashes[trigrama] = (_A * valor + _C) % PRIMO
+            hashes.append(self._hashes[trigrama])
+        firma = np.min(hashes, axis=0).reshape(BANDAS, FILAS)
+        return list(enumerate((firma @ _MEZCLA).tolist()))
+
+    def _agregar(self, etiqueta, trigramas, bandas):
+        numero = len(self.categorias)
+        self.categorias.append(etiqueta)
+        self._trigramas_categoria.append(trigramas)
+        for banda in bandas:
+            cubeta = self._cubetas.setdefault(banda, [])
+            if len(cubeta) < self.MAX_CUBETA:
+                cubeta.append(numero)
+        return numero
+
+    def _buscar(self, trigramas, bandas):
+        candidatas = set(chain.from_iterable(self._cubetas.get(banda, ()) for banda in bandas))
+        self.comparaciones += len(candidatas)
+        mejor, mejor_similitud = None, 0.0
+        # En orden, asi un empate queda con la categoria mas antigua (la de la etiqueta mas frecuente)
+        for numero in sorted(candidatas):
+            cantidad = len(trigramas & self._trigramas_categoria[numero])
+            similitud = cantidad / (len(trigramas) + len(self._trigramas_categoria[numero]) - cantidad)
+            if similitud > mejor_similitud:
+                mejor, mejor_similitud = numero, similitud
+        return mejor if mejor_similitud >= self.umbral else None
+
+    # Categoria canonica de una etiqueta (None para etiquetas vacias como "Ninguno")
+    def categoria(self, etiqueta):
+        if etiqueta not in self._etiquetas:
+            self._etiquetas[etiqueta] = self._resolver(etiqueta)
+        numero = self._etiquetas[etiqueta]
+        return None if numero is None else self.categorias[numero]
+
+    def _resolver(self, etiqueta):
+        raices = normalizar_problema(etiqueta)
+        if not raices:
+            return None
+        if raices not in self._resueltas:
+            trigramas = _trigramas(raices)
+            bandas = self._bandas(trigramas)
+            numero = self._buscar(trigramas, bandas)
+            if numero is None:
+                numero = self._agregar(etiqueta.strip(), trigramas, bandas)
+            self._resueltas[raices] = numero
+        return self._resueltas[raices]
+
+# Banda de la nota de recomendacion, con los mismos cortes que el SNG
+def banda_recomendacion(nota):
+    if es_nulo(nota):
+        return 'Sin nota'
+    if nota >= 6:
+        return 'Promotores'
+    if nota <= 3:
+        return 'Detractores'
+    return 'Pasivos'
+
+def _top(conteos, top):
+    return sorted(conteos.items(), key=lambda item: (-item[1], item[0]))[:top]
+
+# Registra las etiquetas en el indice de la mas frecuente a la menos (a igual frecuencia, la mas
+# corta, que suele ser la mas general): cada categoria toma el nombre de su etiqueta mas comun
+# y el resultado no depende del orden en que llegan los comentarios
+def sembrar_categorias(indice, comentarios):
+    apariciones = {}
+    for comentario in comentarios:
+        for problema in comentario['problems']:
+            apariciones[problema] = apariciones.get(problema, 0) + 1
+    conteos = {}
+    for problema, cantidad in apariciones.items():
+        raices = normalizar_problema(problema)
+        if raices:
+            redacciones = conteos.setdefault(raices, {})
+            redacciones[problema.strip()] = redacciones.get(problema.strip(), 0) + cantidad
+    etiquetas = []
+    for redacciones in conteos.values():
+        # Entre redacciones de la misma etiqueta normalizada se usa la mas comun
+        etiqueta = min(redacciones, key=lambda redaccion: (-redacciones[redaccion], redaccion))
+        etiquetas.append((-sum(redacciones.values()), len(etiqueta), etiqueta))
+    for _, _, etiqueta in sorted(etiquetas):
+        indice.categoria(etiqueta)
+    return indice
+
+# Frecuencia de problemas canonicos: total, por sentimiento y por banda de recomendacion
+def agregar_problemas(comentarios, indice=None, top=10):
+    comentarios = list(comentarios)
+    indice = sembrar_categorias(indice or IndiceProblemas(), comentarios)
+    total, por_sentimiento, por_banda = {}, {}, {}
+    for comentario in comentarios:
+        categorias = {indice.categoria(problema) for problema in comentario['problems']} - {None}
+        sentimiento = comentario['sentiment'].capitalize()
+        banda = banda_recomendacion(comentario.get('recomendacion'))
+        for categoria in categorias:
+            total[categoria] = total.get(categoria, 0) + 1
+            conteos = por_sentimiento.setdefault(sentimiento, {})
+            conteos[categoria] = conteos.get(categoria, 0) + 1
+            conteos = por_banda.setdefault(banda, {})
+            conteos[categoria] = conteos.get(categoria, 0) + 1
+    return {
+        'total': _top(total, top),
+        'por_sentimiento': {clave: _top(conteos, top) for clave, conteos in por_sentimiento.items()},
+        'por_banda': {clave: _top(conteos, top) for clave, conteos in por_banda.items()},
+        'categorias': len(indice.categorias),
+    }
@@ -0,0 +1,153 @@
+""" Metricas por segmento (dimensiones y periodos de tiempo) """
+import numpy as np
+import pandas as pd
+
+from .datos import CHUNK_SIZE, COLUMNAS_METRICAS, PERIODOS, TABLA, fetch_data_chunks
+from .distribuciones import CUANTILES, ESCALA_NOTAS
+
+# Columnas de conteo que se suman entre lotes/grupos
+COLUMNAS_CONTEO = [
+    'total_respuestas', 'promotores_satisfaccion', 'detractores_satisfaccion',
+    'promotores_recomendacion', 'detractores_recomendacion', 'suma_recomendacion',
+    'cantidad_recomendacion', 'total_conocian', 'total_comentarios',
+]
+
+# Histogramas exactos de las notas (una columna de conteo por nota): se suman igual que
+# los demas conteos y de ellos salen la mediana, p10 y p90 de cada segmento
+HISTOGRAMAS = (('satisfaccion', 'satisfeccion_general'), ('recomendacion', 'recomendacion'))
+COLUMNAS_HISTOGRAMA = [f"{prefijo}_{nota}" for prefijo, _ in HISTOGRAMAS for nota in ESCALA_NOTAS]
+COLUMNAS_CONTEO += COLUMNAS_HISTOGRAMA
+
+# Periodo de cada fecha como datetime64 (inicio del dia, de la semana ISO o del mes),
+# calculado con numpy sin formatear cada fila a texto
+def _periodo_fecha(fechas, periodo):
+    dias = fechas.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+    if periodo == 'dia':
+        inicio = dias
+    elif periodo == 'semana':
+        # 1970-01-01 fue jueves: (dias + 3) % 7 da 0 para los lunes
+        inicio = dias - ((dias.view('int64') + 3) % 7).astype('timedelta64[D]')
+    elif periodo == 'mes':
+        inicio = dias.astype('datetime64[M]').astype('datetime64[D]')
+    else:
+        raise ValueError(f"Periodo desconocido: {periodo} (opciones: {', '.join(PERIODOS)})")
+    return pd.Series(inicio, index=fechas.index)
+
+def _etiqueta_periodo(valores, periodo):
+    fechas = pd.to_datetime(pd.Series(valores).astype('string' if periodo == 'mes' else object), errors='coerce')
+    return fechas.dt.strftime('%Y-%m' if periodo == 'mes' else '%Y-%m-%d').to_numpy()
+
+# Metricas derivadas (SNG, promedio y tasas) a partir de los conteos de cada grupo
+def _completar_segmentos(segmentos, claves, periodo):
+    if periodo and len(segmentos):
+        segmentos['periodo'] = _etiqueta_periodo(segmentos['periodo'], periodo)
+    segmentos[COLUMNAS_CONTEO] = segmentos[COLUMNAS_CONTEO].fillna(0).astype('int64')
+    segmentos['fecha_min'] = pd.to_datetime(segmentos['fecha_min'])
+    segmentos['fecha_max'] = pd.to_datetime(segmentos['fecha_max'])
+    total = segmentos['total_respuestas']
+    segmentos['sng_satisfaccion'] = (segmentos['promotores_satisfaccion'] - segmentos['detractores_satisfaccion']) / total * 100
+    segmentos['sng_recomendacion'] = (segmentos['promotores_recomendacion'] - segmentos['detractores_recomendacion']) / total * 100
+    segmentos['promedio_recomendacion'] = segmentos['suma_recomendacion'] / segmentos['cantidad_recomendacion'].where(segmentos['cantidad_recomendacion'] > 0)
+    segmentos['tasa_conocian'] = segmentos['total_conocian'] / total * 100
+    segmentos['tasa_comentarios'] = segmentos['total_comentarios'] / total * 100
+    notas = np.array(ESCALA_NOTAS, dtype='float64')
+    for prefijo, _ in HISTOGRAMAS:
+        acumulado = segmentos[[f"{prefijo}_{nota}" for nota in ESCALA_NOTAS]].to_numpy().cumsum(axis=1)
+        cantidad = acumulado[:, -1:]
+        for nombre, q in CUANTILES:
+            # Rango mas cercano, como cuantil_histograma: primera nota con acumulado >= ceil(q * total)
+            objetivo = np.maximum(np.ceil(q * cantidad), 1)
+            cuantil = notas[(acumulado >= objetivo).argmax(axis=1)]
+            segmentos[f"{nombre}_{prefijo}"] = np.where(cantidad[:, 0] > 0, cuantil, np.nan)
+    return segmentos.sort_values(claves, na_position='last').reset_index(drop=True)
+
+def claves_segmento(dimensiones, periodo):
+    return list(dimensiones) + (['periodo'] if periodo else [])
+
+def _columnas_segmento(dimensiones):
+    return COLUMNAS_METRICAS + [dimension for dimension in dimensiones if dimension not in COLUMNAS_METRICAS]
+
+# Backend pandas: un groupby por lote sobre conteos y se combinan los parciales
+def segmentos_pandas(cursor, dimensiones=(), periodo=None, filtro=None, params=(), chunk_size=CHUNK_SIZE, tabla=TABLA):
+    if not claves_segmento(dimensiones, periodo):
+        raise ValueError("Hay que indicar al menos una dimension o un periodo")
+    chunks = fetch_data_chunks(cursor, chunk_size, _columnas_segmento(dimensiones), filtro, params, tabla=tabla)
+    return agrupar_segmentos(chunks, dimensiones, periodo)
+
+# Metricas por segmento a partir de un iterable de lotes (de la base o de un snapshot)
+def agrupar_segmentos(chunks, dimensiones=(), periodo=None):
+    claves = claves_segmento(dimensiones, periodo)
+    if not claves:
+        raise ValueError("Hay que indicar al menos una dimension o un periodo")
+    agregaciones = dict.fromkeys(COLUMNAS_CONTEO, 'sum')
+    agregaciones.update(fecha_min='min', fecha_max='max')
+    parciales = []
+    for chunk in chunks:
+        satisfaccion, recomendacion = chunk['satisfeccion_general'], chunk['recomendacion']
+        parcial = pd.DataFrame({
+            **{dimension: chunk[dimension] for dimension in dimensiones},
+            **({'periodo': _periodo_fecha(chunk['fecha'], periodo)} if periodo else {}),
+            'total_respuestas': 1,
+            'promotores_satisfaccion': (satisfaccion >= 6).fillna(False).astype('int64'),
+            'detractores_satisfaccion': (satisfaccion <= 3).fillna(False).astype('int64'),
+            'promotores_recomendacion': (recomendacion >= 6).fillna(False).astype('int64'),
+            'detractores_recomendacion': (recomendacion <= 3).fillna(False).astype('int64'),
+            'suma_recomendacion': recomendacion.fillna(0).astype('int64'),
+            'cantidad_recomendacion': recomendacion.notna().astype('int64'),
+            'total_conocian': (chunk['conocia_empresa'] == 'Sí').astype('int64'),
+            'total_comentarios': chunk['recomendacion_abierta'].notna().astype('int64'),
+            **{f"{prefijo}_{nota}": (chunk[columna] == nota).fillna(False).astype('int64')
+               for prefijo, columna in HISTOGRAMAS for nota in ESCALA_NOTAS},
+            'fecha_min': chunk['fecha'],
+            'fecha_max': chunk['fecha'],
+        })
+        parciales.append(parcial.groupby(claves, dropna=False, observed=True).agg(agregaciones))
+        # Los parciales se compactan cada tanto para que la memoria dependa de la cantidad de segmentos
+        if len(parciales) >= 16:
+            parciales = [pd.concat(parciales).groupby(level=claves, dropna=False, observed=True).agg(agregaciones)]
+    if not parciales:
+        return _completar_segmentos(pd.DataFrame(columns=claves + COLUMNAS_CONTEO + ['fecha_min', 'fecha_max']), claves, periodo)
+    segmentos = pd.concat(parciales).groupby(level=claves, dropna=False, observed=True).agg(agregaciones).reset_index()
+    return _completar_segmentos(segmentos, claves, periodo)
+
+# Expresion SQL del periodo (sin '%' para no chocar con los parametros de mysql.connector)
+def _periodo_sql(periodo, driver):
+    if driver == 'sqlite':
+        return {
+            'dia': "date(fecha)",
+            'semana': "date(fecha, '-' || ((CAST(strftime('%w', fecha) AS INTEGER) + 6) % 7) || ' days')",
+            'mes': "substr(fecha, 1, 7)",
+        }[periodo]
+    return {
+        'dia': "DATE(fecha)",
+        'semana': "DATE(DATE_SUB(fecha, INTERVAL WEEKDAY(fecha) DAY))",
+        'mes': "CONCAT(YEAR(fecha), '-', LPAD(MONTH(fecha), 2, '0'))",
+    }[periodo]
+
+# Backend SQL: un solo GROUP BY en la base de datos
+def segmentos_sql(cursor, dimensiones=(), periodo=None, filtro=None, params=(), chunk_size=None, tabla=TABLA):
+    claves = claves_segmento(dimensiones, periodo)
+    if not claves:
+        raise ValueError("Hay que indicar al menos una dimension o un periodo")
+    if periodo and periodo not in PERIODOS:
+        raise ValueError(f"Periodo desconocido: {periodo} (opciones: {', '.join(PERIODOS)})")
+    expresiones = list(dimensiones) + ([f"{_periodo_sql(periodo, getattr(cursor, 'driver', 'mysql'))} AS periodo"] if periodo else [])
+    where = f" WHERE {filtro}" if filtro else ""
+    histogramas = ''.join(f"SUM(CASE WHEN {columna} = {nota} THEN 1 ELSE 0 END), "
+                          for _, columna in HISTOGRAMAS for nota in ESCALA_NOTAS)
+    cursor.execute(
+        f"SELECT {', '.join(expresiones)}, COUNT(*), "
+        "SUM(CASE WHEN satisfeccion_general >= 6 THEN 1 ELSE 0 END), SUM(CASE WHEN satisfeccion_general <= 3 THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN recomendacion >= 6 THEN 1 ELSE 0 END), SUM(CASE WHEN recomendacion <= 3 THEN 1 ELSE 0 END), "
+        "SUM(recomendacion), COUNT(recomendacion), "
+        "SUM(CASE WHEN conocia_empresa = 'Sí' THEN 1 ELSE 0 END), COUNT(recomendacion_abierta), "
+        f"{histogramas}MIN(fecha), MAX(fecha) FROM {tabla}{where} GROUP BY {', '.join(str(numero) for numero in range(1, len(claves) + 1))}",
+        params,
+    )
+    segmentos = pd.DataFrame(cursor.fetchall(), columns=claves + COLUMNAS_CONTEO + ['fecha_min', 'fecha_max'])
+    return _completar_segmentos(segmentos, claves, periodo)
+
+BACKENDS_SEGMENTOS = {
+    'pandas': segmentos_pandas,
+    'sql': segmentos_sql,
+}
@@ -0,0 +1,318 @@
+""" Servicio HTTP local: metricas, graficos e informes a pedido con cache de resultados """
+import importlib
+import io
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from .conexion import ErrorConexion, connectDB, obtener_pool
+from .datos import COLUMNA_ID, PERIODOS, TABLA, ventana_fechas
+from .distribuciones import TDigest
+from .instrumentacion import logger
+from .metricas import BACKENDS_METRICAS
+from .pipeline import calcular, obtener_comentarios
+
+# El proceso queda levantado con el pool de conexiones abierto y matplotlib/fpdf ya importados,
+# asi cada pedido solo paga la consulta y el dibujo. Ejemplos:
+#   GET /metricas?segmentos=proyecto&periodo=mes
+#   GET /graficos.svg?segmento=proyecto&valor=Norte
+#   GET /informe.pdf?segmento=proyecto&valor=Norte&modo=resumen
+#   GET /metricas?ultimos_dias=30&backend=sql
+#   GET /estadisticas
+
+PARAMETROS = {'backend', 'segmentos', 'periodo', 'segmento', 'valor', 'clasificador', 'modo', 'desde', 'hasta', 'ultimos_dias'}
+
+# Nombres de columnas que se interpolan en el SQL (dimensiones y columna del segmento)
+_IDENTIFICADOR = re.compile(r'^[A-Za-z_]\w*$')
+
+# Error del pedido (parametros invalidos): se responde 400
+class ErrorConsulta(ValueError):
+    pass
+
+# Cache LRU de respuestas ya calculadas; cada entrada vence a los ttl segundos
+class CacheResultados:
+    def __init__(self, max_entradas=128, ttl=300):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave):
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None or time.monotonic() - entrada[0] > self.ttl:
+                self._entradas.pop(clave, None)
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return entrada[1]
+
+    def guardar(self, clave, valor):
+        with self._lock:
+            self._entradas[clave] = (time.monotonic(), valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def estadisticas(self):
+        with self._lock:
+            return {'entradas': len(self._entradas), 'aciertos': self.aciertos, 'fallos': self.fallos}
+
+# Une pedidos identicos concurrentes: el primero calcula y los demas esperan su resultado.
+# ejecutar devuelve (resultado, propio); propio es False si se espero el calculo de otro pedido
+class Coalescedor:
+    def __init__(self):
+        self.unidos = 0
+        self._en_curso = {}
+        self._lock = threading.Lock()
+
+    def ejecutar(self, clave, funcion):
+        with self._lock:
+            futuro = self._en_curso.get(clave)
+            propio = futuro is None
+            if propio:
+                futuro = self._en_curso[clave] = Future()
+            else:
+                self.unidos += 1
+        if not propio:
+            return futuro.result(), False
+        try:
+            futuro.set_result(funcion())
+        except BaseException as e:
+            futuro.set_exception(e)
+        finally:
+            with self._lock:
+                del self._en_curso[clave]
+        return futuro.result(), True
+
+# Latencias por ruta en un t-digest (memoria acotada sin importar la cantidad de pedidos)
+class Latencias:
+    def __init__(self):
+        self._digests = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, ruta, segundos):
+        with self._lock:
+            self._digests.setdefault(ruta, TDigest()).agregar([segundos])
+
+    def resumen(self):
+        with self._lock:
+            return {
+                ruta: {'pedidos': digest.total, 'p50_ms': digest.cuantil(0.5) * 1000, 'p99_ms': digest.cuantil(0.99) * 1000,
+                       'max_ms': digest.maximo * 1000}
+                for ruta, digest in self._digests.items()
+            }
+
+# Parametros del pedido validados: dimensiones, periodo, backend y el filtro del segmento
+def leer_consulta(query):
+    parametros = {clave: valores[-1] for clave, valores in parse_qs(query).items()}
+    desconocidos = set(parametros) - PARAMETROS
+    if desconocidos:
+        raise ErrorConsulta(f"Parametros desconocidos: {', '.join(sorted(desconocidos))}")
+    consulta = {
+        'backend': parametros.get('backend', 'pandas'),
+        'dimensiones': tuple(dimension for dimension in parametros.get('segmentos', '').split(',') if dimension),
+        'periodo': parametros.get('periodo') or None,
+        'clasificador': parametros.get('clasificador', 'lexico'),
+        'modo': parametros.get('modo') or None,
+        'filtro': None,
+        'params': (),
+        # La ventana se guarda como se pidio: con ultimos_dias los limites se calculan en cada pedido
+        'desde': parametros.get('desde') or None,
+        'hasta': parametros.get('hasta') or None,
+        'ultimos_dias': parametros.get('ultimos_dias') or None,
+    }
+    if consulta['backend'] not in BACKENDS_METRICAS:
+        raise ErrorConsulta(f"Backend desconocido: {consulta['backend']}")
+    if consulta['periodo'] and consulta['periodo'] not in PERIODOS:
+        raise ErrorConsulta(f"Periodo desconocido: {consulta['periodo']} (opciones: {', '.join(PERIODOS)})")
+    if consulta['clasificador'] not in ('lexico', 'llm'):
+        raise ErrorConsulta(f"Clasificador desconocido: {consulta['clasificador']}")
+    if consulta['modo'] not in (None, 'completo', 'resumen'):
+        raise ErrorConsulta(f"Modo desconocido: {consulta['modo']}")
+    columnas = list(consulta['dimensiones'])
+    if 'segmento' in parametros:
+        if 'valor' not in parametros:
+            raise ErrorConsulta("Con 'segmento' hay que indicar 'valor'")
+        columnas.append(parametros['segmento'])
+        consulta['filtro'] = f"{parametros['segmento']} = %s"
+        consulta['params'] = (parametros['valor'],)
+    for columna in columnas:
+        if not _IDENTIFICADOR.match(columna):
+            raise ErrorConsulta(f"Columna invalida: {columna}")
+    try:
+        if consulta['ultimos_dias'] is not None:
+            consulta['ultimos_dias'] = float(consulta['ultimos_dias'])
+        _ventana(consulta)
+    except ValueError as e:
+        raise ErrorConsulta(str(e)) from e
+    return consulta
+
+def _ventana(consulta):
+    return ventana_fechas(consulta['desde'], consulta['hasta'], consulta['ultimos_dias'])
+
+class ServicioEncuesta:
+    def __init__(self, max_entradas=128, ttl=300, tabla=TABLA, intervalo_marca=2):
+        self.tabla = tabla
+        self.intervalo_marca = intervalo_marca
+        self._marca = None
+        self._marca_leida = 0.0
+        self._lock_marca = threading.Lock()
+        self.cache = CacheResultados(max_entradas, ttl)
+        self.coalescedor = Coalescedor()
+        self.latencias = Latencias()
+        # Las figuras de matplotlib se reutilizan entre informes: se dibuja de a un pedido por vez
+        self._lock_dibujo = threading.Lock()
+        self.rutas = {
+            '/metricas': ('application/json; charset=utf-8', self.metricas),
+            '/graficos.png': ('image/png', lambda consulta: self.graficos(consulta, 'png')),
+            '/graficos.svg': ('image/svg+xml', lambda consulta: self.graficos(consulta, 'svg')),
+            '/informe.pdf': ('application/pdf', self.informe),
+        }
+
+    # Importa las librerias pesadas y abre el pool antes del primer pedido
+    def precalentar(self):
+        importlib.import_module('.informes', __package__)
+        obtener_pool()
+        return self
+
+    # Marca de agua de la tabla: MAX(id) y MAX(fecha) sin filtro, que la base resuelve leyendo
+    # un extremo de la clave primaria y del indice de fecha (sin recorrer filas). Cambia al agregar
+    # filas en cualquier segmento; las modificaciones y borrados se reflejan al vencer el ttl.
+    # Se consulta a lo sumo cada intervalo_marca segundos y la comparten todos los pedidos
+    def marca_de_agua(self):
+        with self._lock_marca:
+            if self._marca is not None and time.monotonic() - self._marca_leida < self.intervalo_marca:
+                return self._marca
+            conn, cursor = connectDB()
+            if not (conn and cursor):
+                return None
+            try:
+                ultimo_id = f"MAX({COLUMNA_ID})" if COLUMNA_ID else "NULL"
+                cursor.execute(f"SELECT {ultimo_id}, MAX(fecha) FROM {self.tabla}")
+                self._marca = tuple(str(valor) for valor in cursor.fetchone())
+                self._marca_leida = time.monotonic()
+            finally:
+                cursor.close()
+                conn.close()
+            return self._marca
+
+    def _calcular(self, consulta):
+        resultado, segmentos, _ = calcular(consulta['backend'], consulta['dimensiones'], consulta['periodo'],
+                                           filtro=consulta['filtro'], params=consulta['params'], ventana=_ventana(consulta))
+        if resultado is None:
+            raise ErrorConexion("No se pudo establecer la conexión a la base de datos")
+        return resultado, segmentos
+
+    def metricas(self, consulta):
+        resultado, segmentos = self._calcular(consulta)
+        salida = {'metricas': resultado}
+        if segmentos is not None:
+            salida['segmentos'] = segmentos.to_dict('records')
+        return json.dumps(salida, ensure_ascii=False, default=str).encode('utf-8')
+
+    def graficos(self, consulta, formato):
+        from .graficos import crear_grafico_segmentos, crear_graficos
+        resultado, segmentos = self._calcular(consulta)
+        with self._lock_dibujo:
+            if segmentos is not None and len(segmentos):
+                fig = crear_grafico_segmentos(segmentos, consulta['dimensiones'], consulta['periodo'])
+            else:
+                fig = crear_graficos(resultado)
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=formato)
+        return buffer.getvalue()
+
+    def informe(self, consulta):
+        from .informes import generar_informe_completo
+        resultado, segmentos = self._calcular(consulta)
+        comments = obtener_comentarios(None, consulta['clasificador'], consulta['filtro'], consulta['params'], _ventana(consulta))
+        buffer = io.BytesIO()
+        with self._lock_dibujo:
+            generar_informe_completo(resultado, comments, buffer, consulta['modo'], segmentos=segmentos,
+                                     dimensiones=consulta['dimensiones'], periodo=consulta['periodo'])
+        return buffer.getvalue()
+
+    # Respuesta de una ruta: de la cache si los datos no cambiaron, si no se calcula una sola vez
+    # aunque lleguen varios pedidos iguales al mismo tiempo. Devuelve (tipo, contenido, origen)
+    def responder(self, ruta, query):
+        tipo, funcion = self.rutas[ruta]
+        consulta = leer_consulta(query)
+        clave = (ruta, json.dumps(consulta, sort_keys=True), self.marca_de_agua())
+        contenido = self.cache.obtener(clave)
+        if contenido is not None:
+            return tipo, contenido, 'cache'
+        contenido, propio = self.coalescedor.ejecutar(clave, lambda: funcion(consulta))
+        if propio:
+            self.cache.guardar(clave, contenido)
+        return tipo, contenido, 'calculado' if propio else 'unido'
+
+    def estadisticas(self):
+        return {
+            'latencias': self.latencias.resumen(),
+            'cache': self.cache.estadisticas(),
+            'pedidos_unidos': self.coalescedor.unidos,
+            'consultas': obtener_pool().copiar_estadisticas(),
+        }
+
+def crear_manejador(servicio):
+    class Manejador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            inicio = time.perf_counter()
+            url = urlsplit(self.path)
+            try:
+                if url.path == '/estadisticas':
+                    self._enviar(200, 'application/json; charset=utf-8',
+                                 json.dumps(servicio.estadisticas(), ensure_ascii=False, default=str).encode('utf-8'))
+                elif url.path in servicio.rutas:
+                    tipo, contenido, origen = servicio.responder(url.path, url.query)
+                    self._enviar(200, tipo, contenido, {'X-Origen': origen})
+                else:
+                    self._error(404, f"Ruta desconocida: {url.path} (opciones: {', '.join(list(servicio.rutas) + ['/estadisticas'])})")
+            except ErrorConsulta as e:
+                self._error(400, str(e))
+            except ErrorConexion as e:
+                self._error(503, str(e))
+            except Exception as e:
+                logger.exception(f"Error en {self.path}")
+                self._error(500, f"{type(e).__name__}: {e}")
+            # Las rutas desconocidas se agrupan para no crear un digest por cada path inventado
+            ruta = url.path if url.path in servicio.rutas or url.path == '/estadisticas' else 'otras'
+            servicio.latencias.registrar(ruta, time.perf_counter() - inicio)
+
+        def _enviar(self, codigo, tipo, contenido, encabezados=None):
+            self.send_response(codigo)
+            self.send_header('Content-Type', tipo)
+            self.send_header('Content-Length', str(len(contenido)))
+            for nombre, valor in (encabezados or {}).items():
+                self.send_header(nombre, valor)
+            self.end_headers()
+            self.wfile.write(contenido)
+
+        def _error(self, codigo, mensaje):
+            self._enviar(codigo, 'application/json; charset=utf-8', json.dumps({'error': mensaje}, ensure_ascii=False).encode('utf-8'))
+
+        def log_message(self, formato, *args):
+            logger.info(f"{self.address_string()} {formato % args}")
+
+    return Manejador
+
+def servir(host='127.0.0.1', puerto=8000, max_entradas=128, ttl=300, intervalo_marca=2):
+    servicio = ServicioEncuesta(max_entradas, ttl, intervalo_marca=intervalo_marca).precalentar()
+    servidor = ThreadingHTTPServer((host, puerto), crear_manejador(servicio))
+    logger.info(f"Servicio escuchando en http://{host}:{servidor.server_address[1]}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+    return servicio.estadisticas()
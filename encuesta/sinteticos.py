@@ -0,0 +1,258 @@
+""" Datos sinteticos y benchmarks """
+import json
+import math
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .clasificacion import clasificar_comentarios, leer_comentarios
+from .conexion import CONFIG_DEFAULT, CursorMedido, ErrorConexion, PoolConexiones, connectDB
+from .datos import CHUNK_SIZE, TABLA, fetch_data
+from .ejemplos import COMENTARIOS_EJEMPLO
+from .graficos import crear_graficos
+from .informes import create_pdf, generar_informe_completo, generar_informe_metricas, merge_pdfs
+from .instrumentacion import logger
+from .metricas import (
+    calcular_duracion_encuesta, metricas_pandas, metricas_sql, promedio_recomendacion,
+    recomendacion_sng, satisfaccion_sng, total_comentarios, total_conocia_empresa,
+)
+from .segmentos import segmentos_sql
+
+# Pesos de cada nota (1 a 7) para generar las columnas de puntaje
+PESOS_SATISFACCION = (0.12, 0.08, 0.10, 0.15, 0.20, 0.18, 0.17)
+PESOS_RECOMENDACION = (0.15, 0.08, 0.10, 0.12, 0.18, 0.17, 0.20)
+
+# Comentarios sinteticos armados con palabras de los comentarios de ejemplo; el largo
+# (en palabras) sigue una lognormal. Se arma un conjunto fijo y cada fila elige uno al azar,
+# asi generar millones de filas no implica armar millones de textos
+def _comentarios_sinteticos(azar, cantidad, largo_medio, largo_desvio):
+    palabras = np.array(re.findall(r'\w+', ' '.join(comentario['comment'] for comentario in COMENTARIOS_EJEMPLO)))
+    sigma = math.sqrt(math.log(1 + (largo_desvio / largo_medio) ** 2))
+    largos = np.maximum(1, azar.lognormal(math.log(largo_medio) - sigma ** 2 / 2, sigma, cantidad).astype(int))
+    return np.array([' '.join(azar.choice(palabras, largo)).capitalize() + '.' for largo in largos], dtype=object)
+
+# Genera la tabla encuesta por lotes de DataFrames (mismas columnas que la tabla real,
+# mas proyecto y canal para probar los segmentos)
+def generar_encuesta(filas, chunk_size=CHUNK_SIZE, semilla=0, fecha_inicio='2024-01-01', dias=180,
+                     proyectos=20, canales=('Web', 'Sala de ventas', 'Corredor', 'Referido'),
+                     pesos_satisfaccion=PESOS_SATISFACCION, pesos_recomendacion=PESOS_RECOMENDACION,
+                     prob_conocia=0.55, prob_comentario=0.4, largo_comentario=(25, 20)):
+    azar = np.random.default_rng(semilla)
+    textos = _comentarios_sinteticos(azar, 2000, *largo_comentario)
+    nombres_proyectos = np.array([f"Proyecto {numero:03d}" for numero in range(1, proyectos + 1)], dtype=object)
+    canales = np.array(canales, dtype=object)
+    inicio = np.datetime64(fecha_inicio, 's')
+    segundos_totales = dias * 86400
+    for desde in range(0, filas, chunk_size):
+        cantidad = min(chunk_size, filas - desde)
+        notas = np.arange(1, len(pesos_satisfaccion) + 1)
+        comentarios = np.where(azar.random(cantidad) < prob_comentario, textos[azar.integers(0, len(textos), cantidad)], None)
+        # Las fechas crecen con el id, como en una tabla que se va llenando
+        segundos = np.sort(azar.integers(desde * segundos_totales // filas, (desde + cantidad) * segundos_totales // filas + 1, cantidad))
+        yield pd.DataFrame({
+            'id': np.arange(desde + 1, desde + cantidad + 1),
+            'satisfeccion_general': azar.choice(notas, cantidad, p=pesos_satisfaccion),
+            'recomendacion': azar.choice(np.arange(1, len(pesos_recomendacion) + 1), cantidad, p=pesos_recomendacion),
+            'conocia_empresa': np.where(azar.random(cantidad) < prob_conocia, 'Sí', 'No').astype(object),
+            'recomendacion_abierta': comentarios,
+            'fecha': pd.to_datetime(inicio + segundos.astype('timedelta64[s]')),
+            'proyecto': nombres_proyectos[azar.integers(0, proyectos, cantidad)],
+            'canal': canales[azar.integers(0, len(canales), cantidad)],
+        })
+
+# Carga los lotes en una base (MySQL/MariaDB o SQLite) con la conexion y el cursor dados
+def cargar_encuesta(conn, cursor, chunks, tabla=TABLA, crear=True):
+    if crear:
+        cursor.execute(
+            f"CREATE TABLE {tabla} (id INTEGER PRIMARY KEY, satisfeccion_general SMALLINT, recomendacion SMALLINT, "
+            "conocia_empresa VARCHAR(2), recomendacion_abierta TEXT, fecha DATETIME, proyecto VARCHAR(64), canal VARCHAR(32))"
+        )
+        cursor.execute(f"CREATE INDEX idx_{tabla}_fecha ON {tabla} (fecha)")
+    total = 0
+    for chunk in chunks:
+        chunk = chunk.assign(fecha=chunk['fecha'].dt.strftime('%Y-%m-%d %H:%M:%S'))
+        filas = [tuple(None if pd.isna(valor) else valor.item() if hasattr(valor, 'item') else valor for valor in fila)
+                 for fila in chunk.itertuples(index=False)]
+        cursor.executemany(f"INSERT INTO {tabla} ({', '.join(chunk.columns)}) VALUES ({', '.join(['%s'] * len(chunk.columns))})", filas)
+        conn.commit()
+        total += len(filas)
+    return total
+
+# Guarda los lotes en un archivo CSV o Parquet (Parquet requiere pyarrow)
+def guardar_encuesta(chunks, path):
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError("Para guardar en Parquet hace falta instalar pyarrow")
+        escritor = None
+        try:
+            for chunk in chunks:
+                tabla = pyarrow.Table.from_pandas(chunk, preserve_index=False)
+                if escritor is None:
+                    escritor = pyarrow.parquet.ParquetWriter(path, tabla.schema)
+                escritor.write_table(tabla)
+        finally:
+            if escritor is not None:
+                escritor.close()
+    else:
+        for numero, chunk in enumerate(chunks):
+            chunk.to_csv(path, mode='w' if numero == 0 else 'a', header=numero == 0, index=False, date_format='%Y-%m-%d %H:%M:%S')
+
+# Genera una encuesta sintetica en destino: .db/.sqlite (SQLite), .csv, .parquet o "mysql"
+# (la base configurada en ENCUESTA_DB_*)
+def crear_encuesta_sintetica(filas, destino, tabla=TABLA, **kwargs):
+    chunks = generar_encuesta(filas, **kwargs)
+    if destino.endswith(('.csv', '.parquet')):
+        guardar_encuesta(chunks, destino)
+        return filas
+    if destino == 'mysql':
+        conn, cursor = connectDB()
+        if not (conn and cursor):
+            raise ErrorConexion("No se pudo establecer la conexión a la base de datos")
+    else:
+        pool = PoolConexiones(dict(CONFIG_DEFAULT, driver='sqlite', database=destino, pool_size=1))
+        conn = pool.obtener()
+        cursor = CursorMedido(conn.cursor(), pool)
+    try:
+        return cargar_encuesta(conn, cursor, chunks, tabla)
+    finally:
+        cursor.close()
+        conn.close()
+
+# Mide tiempo y memoria pico (tracemalloc, incluye los arrays de numpy/pandas) de una etapa.
+# Con tracemalloc activo los tiempos son algo mayores que en una corrida normal
+def medir_etapa(etapas, nombre, funcion, *args, **kwargs):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    try:
+        return funcion(*args, **kwargs)
+    finally:
+        segundos = time.perf_counter() - inicio
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        etapas[nombre] = {'segundos': round(segundos, 4), 'memoria_pico_mb': round(pico / 2 ** 20, 2)}
+        logger.info(f"  {nombre}: {segundos:.3f}s, {pico / 2 ** 20:.1f} MB", extra={'datos': dict(etapas[nombre], etapa=nombre)})
+
+def _version_codigo():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# Corre cada etapa del pipeline sobre encuestas sinteticas de cada tamaño (en SQLite)
+# y guarda los resultados en JSON para comparar entre versiones
+def benchmark_pipeline(tamanos=(10_000, 1_000_000, 10_000_000), salida='benchmark.json', directorio=None):
+    directorio = directorio or tempfile.mkdtemp()
+    resultados = []
+    for tamano in tamanos:
+        logger.info(f"{tamano} filas:")
+        etapas = {}
+        base = os.path.join(directorio, f"encuesta_{tamano}.db")
+        if os.path.exists(base):
+            os.remove(base)
+        medir_etapa(etapas, 'generar_encuesta', crear_encuesta_sintetica, tamano, base)
+        pool = PoolConexiones(dict(CONFIG_DEFAULT, driver='sqlite', database=base, pool_size=1))
+
+        def consultar(funcion, *args, **kwargs):
+            conn = pool.obtener()
+            cursor = CursorMedido(conn.cursor(), pool)
+            try:
+                return funcion(cursor, *args, **kwargs)
+            finally:
+                cursor.close()
+                conn.close()
+
+        data = medir_etapa(etapas, 'fetch_data', consultar, fetch_data)
+        medir_etapa(etapas, 'satisfaccion_sng', satisfaccion_sng, data, 'satisfeccion_general')
+        medir_etapa(etapas, 'total_conocia_empresa', total_conocia_empresa, data)
+        medir_etapa(etapas, 'recomendacion_sng', recomendacion_sng, data, 'recomendacion')
+        medir_etapa(etapas, 'promedio_recomendacion', promedio_recomendacion, data, 'recomendacion')
+        medir_etapa(etapas, 'total_comentarios', total_comentarios, data, 'recomendacion_abierta')
+        medir_etapa(etapas, 'calcular_duracion_encuesta', calcular_duracion_encuesta, data)
+        del data
+        resultado = medir_etapa(etapas, 'metricas_pandas', consultar, metricas_pandas).result()
+        medir_etapa(etapas, 'metricas_sql', consultar, metricas_sql)
+        medir_etapa(etapas, 'segmentos_sql', consultar, segmentos_sql, ('proyecto',), 'semana')
+        medir_etapa(etapas, 'crear_graficos', crear_graficos, resultado)
+        comentarios = medir_etapa(etapas, 'leer_comentarios', consultar, leer_comentarios)
+        comments = medir_etapa(etapas, 'clasificar_comentarios', clasificar_comentarios, comentarios,
+                               cache_path=os.path.join(directorio, f"cache_{tamano}.sqlite"))
+        del comentarios
+        seccion_metricas = os.path.join(directorio, f"Informe_encuesta_{tamano}.pdf")
+        seccion_comentarios = os.path.join(directorio, f"Informe_gpt_{tamano}.pdf")
+        medir_etapa(etapas, 'generar_informe_metricas', generar_informe_metricas, resultado, seccion_metricas)
+        medir_etapa(etapas, 'create_pdf', create_pdf, comments, seccion_comentarios)
+        medir_etapa(etapas, 'merge_pdfs', merge_pdfs, [seccion_metricas, seccion_comentarios],
+                    os.path.join(directorio, f"Informe_merge_{tamano}.pdf"))
+        medir_etapa(etapas, 'generar_informe_completo', generar_informe_completo, resultado, comments,
+                    os.path.join(directorio, f"Informe_completo_{tamano}.pdf"))
+        del comments
+        os.remove(base)
+        resultados.append({'filas': tamano, 'etapas': etapas})
+
+    informe = {
+        'version': _version_codigo(),
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'pandas': pd.__version__,
+        'resultados': resultados,
+    }
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(informe, f, indent=2)
+    logger.info(f"Resultados guardados en '{salida}'")
+    return informe
+
+# Compara dos archivos de benchmark: cociente de tiempo y memoria por etapa y tamaño
+# (se marcan las etapas que empeoraron mas que la tolerancia)
+def comparar_benchmarks(anterior, actual, tolerancia=0.2):
+    with open(anterior, encoding='utf-8') as f:
+        base = {resultado['filas']: resultado['etapas'] for resultado in json.load(f)['resultados']}
+    with open(actual, encoding='utf-8') as f:
+        nuevo = {resultado['filas']: resultado['etapas'] for resultado in json.load(f)['resultados']}
+    regresiones = []
+    for filas in sorted(set(base) & set(nuevo)):
+        logger.info(f"{filas} filas:")
+        for etapa in nuevo[filas]:
+            if etapa not in base[filas]:
+                continue
+            antes, despues = base[filas][etapa], nuevo[filas][etapa]
+            tiempo = despues['segundos'] / antes['segundos'] if antes['segundos'] else float('inf')
+            memoria = despues['memoria_pico_mb'] / antes['memoria_pico_mb'] if antes['memoria_pico_mb'] else float('inf')
+            marca = ' <-- regresion' if tiempo > 1 + tolerancia or memoria > 1 + tolerancia else ''
+            if marca:
+                regresiones.append((filas, etapa))
+            logger.info(f"  {etapa}: tiempo x{tiempo:.2f}, memoria x{memoria:.2f}{marca}",
+                        extra={'datos': {'filas': filas, 'etapa': etapa, 'tiempo': tiempo, 'memoria': memoria, 'regresion': bool(marca)}})
+    return regresiones
+
+
+# Tiempo y tamaño del informe de comentarios para distintas cantidades de comentarios
+# (se generan repitiendo los comentarios de ejemplo)
+def benchmark_create_pdf(tamanos=(1000, 10000, 100000), modo='resumen', directorio=None):
+    directorio = directorio or tempfile.mkdtemp()
+    azar = random.Random(0)
+    resultados = []
+    for tamano in tamanos:
+        comments = [
+            dict(COMENTARIOS_EJEMPLO[indice % len(COMENTARIOS_EJEMPLO)], recomendacion=azar.randint(1, 7))
+            for indice in range(tamano)
+        ]
+        filename = os.path.join(directorio, f"benchmark_{modo}_{tamano}.pdf")
+        inicio = time.perf_counter()
+        create_pdf(comments, filename, modo)
+        segundos = time.perf_counter() - inicio
+        resultados.append({'comentarios': tamano, 'modo': modo, 'segundos': segundos, 'bytes': os.path.getsize(filename)})
+        logger.info(f"{tamano} comentarios ({modo}): {segundos:.2f}s, {os.path.getsize(filename) / 1024:.0f} KB", extra={'datos': resultados[-1]})
+    return resultados
@@ -0,0 +1,261 @@
+""" Snapshots locales: cache columnar de la tabla en disco """
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from .conexion import cargar_config, connectDB
+from .datos import CHUNK_SIZE, COLUMNAS_METRICAS, TABLA, fetch_data_chunks, tipar_chunk
+from .instrumentacion import instrumentacion, logger
+
+# Cada snapshot es un directorio con un archivo binario por columna (y su mascara de nulos)
+# mas un meta.json con los tipos, las categorias y la cantidad de filas. Los binarios se
+# abren con np.memmap, asi que solo se leen del disco las columnas que se usan.
+# Los textos se guardan como en Arrow: todos los bytes UTF-8 seguidos y un arreglo de offsets.
+DIRECTORIO_SNAPSHOTS = 'cache_snapshots'
+
+# Version del formato de los archivos, es parte de la clave (un cambio de formato no lee
+# los snapshots viejos)
+FORMATO = 2
+
+class CacheSnapshots:
+    def __init__(self, directorio=DIRECTORIO_SNAPSHOTS, ttl=3600, max_bytes=1024 * 2 ** 20):
+        self.directorio = directorio
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(directorio, exist_ok=True)
+
+    @staticmethod
+    def clave(fuente, query, params=()):
+        texto = json.dumps([FORMATO, fuente, query, list(params)], default=str)
+        return hashlib.sha256(texto.encode('utf-8')).hexdigest()[:32]
+
+    def _path(self, clave, *partes):
+        return os.path.join(self.directorio, clave, *partes)
+
+    # Escribe los lotes a medida que llegan (la tabla completa no pasa por memoria).
+    # El tipo de cada columna sale del primer lote; una columna entera que despues trae
+    # decimales se pasa a float (reescribiendo lo ya guardado)
+    def guardar(self, clave, chunks, **info):
+        temporal = os.path.join(self.directorio, f"{clave}.tmp-{os.getpid()}")
+        shutil.rmtree(temporal, ignore_errors=True)
+        os.makedirs(temporal)
+        columnas, archivos, filas = {}, {}, 0
+        try:
+            for chunk in chunks:
+                for nombre in chunk.columns:
+                    if nombre not in columnas:
+                        columnas[nombre] = self._tipo_columna(chunk[nombre])
+                    self._escribir_columna(temporal, archivos, nombre, columnas[nombre], chunk[nombre], filas)
+                filas += len(chunk)
+        finally:
+            for archivo in archivos.values():
+                archivo.close()
+        meta = dict(info, creado=time.time(), filas=filas, columnas=columnas)
+        with open(os.path.join(temporal, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, default=str)
+        shutil.rmtree(self._path(clave), ignore_errors=True)
+        os.replace(temporal, self._path(clave))
+        self.desalojar(conservar=clave)
+        return meta
+
+    @staticmethod
+    def _tipo_columna(serie):
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            return {'tipo': 'categoria', 'categorias': []}
+        if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+            return {'tipo': 'fecha'}
+        # Los enteros de numpy tambien: un lote posterior con nulos llega como float con NaN
+        if pd.api.types.is_integer_dtype(serie.dtype):
+            return {'tipo': 'entero', 'dtype': getattr(serie.dtype, 'numpy_dtype', serie.dtype).str}
+        if pd.api.types.is_numeric_dtype(serie.dtype) or pd.api.types.is_bool_dtype(serie.dtype):
+            return {'tipo': 'numero', 'dtype': serie.dtype.str}
+        return {'tipo': 'texto'}
+
+    @staticmethod
+    def _escribir_columna(directorio, archivos, nombre, columna, serie, filas):
+        def escribir(sufijo, arreglo):
+            archivo = f"{nombre}.{sufijo}"
+            if archivo not in archivos:
+                archivos[archivo] = open(os.path.join(directorio, archivo), 'wb')
+            archivos[archivo].write(np.ascontiguousarray(arreglo).tobytes())
+
+        tipo = columna['tipo']
+        if tipo == 'categoria':
+            serie = serie.astype('category')
+            categorias = columna['categorias']
+            for categoria in serie.cat.categories:
+                if categoria not in categorias:
+                    categorias.append(categoria)
+            # Los codigos de cada lote se pasan a las categorias globales del snapshot
+            mapa = np.array([categorias.index(categoria) for categoria in serie.cat.categories] + [-1], dtype='int16')
+            escribir('codigos', mapa[serie.cat.codes.to_numpy()])
+        elif tipo == 'fecha':
+            # Al leer no hace falta la mascara: los nulos ya quedan como NaT
+            escribir('valores', pd.to_datetime(serie).to_numpy(dtype='datetime64[ns]').view('int64'))
+            escribir('nulos', serie.isna().to_numpy())
+        elif tipo in ('entero', 'numero'):
+            nulos = serie.isna().to_numpy()
+            if tipo == 'entero' and not CacheSnapshots._entran(serie[~nulos], columna['dtype']):
+                CacheSnapshots._ensanchar(directorio, archivos, nombre, columna)
+            if columna['tipo'] == 'entero':
+                valores = pd.to_numeric(serie).fillna(0).to_numpy(dtype=columna['dtype'])
+            elif columna['dtype'] == '|b1':
+                valores = serie.to_numpy(dtype='bool', na_value=False)
+            else:
+                valores = pd.to_numeric(serie).to_numpy(dtype=columna['dtype'], na_value=np.nan)
+            escribir('valores', valores)
+            escribir('nulos', nulos)
+        else:
+            nulos = serie.isna().to_numpy()
+            datos = [b'' if nulo else str(valor).encode('utf-8') for valor, nulo in zip(serie.tolist(), nulos)]
+            if 'bytes' not in columna:
+                columna['bytes'] = 0
+                escribir('offsets', np.zeros(1, dtype='int64'))
+            offsets = columna['bytes'] + np.cumsum([len(dato) for dato in datos], dtype='int64')
+            columna['bytes'] = int(offsets[-1]) if len(offsets) else columna['bytes']
+            escribir('offsets', offsets)
+            escribir('datos', np.frombuffer(b''.join(datos), dtype='uint8'))
+            escribir('nulos', nulos)
+
+    # Si los valores (sin nulos) son enteros que entran en dtype
+    @staticmethod
+    def _entran(serie, dtype):
+        valores = pd.to_numeric(serie).to_numpy(dtype='float64')
+        info = np.iinfo(dtype)
+        return bool(np.all((valores == np.round(valores)) & (valores >= info.min) & (valores <= info.max)))
+
+    # Pasa una columna entera ya escrita a float64 (los nulos quedan como NaN)
+    @staticmethod
+    def _ensanchar(directorio, archivos, nombre, columna):
+        valores = np.empty(0, dtype='float64')
+        if f"{nombre}.valores" in archivos:
+            archivos.pop(f"{nombre}.valores").close()
+            archivos[f"{nombre}.nulos"].flush()
+            valores = np.fromfile(os.path.join(directorio, f"{nombre}.valores"), dtype=columna['dtype']).astype('float64')
+            valores[np.fromfile(os.path.join(directorio, f"{nombre}.nulos"), dtype='bool')] = np.nan
+        archivos[f"{nombre}.valores"] = open(os.path.join(directorio, f"{nombre}.valores"), 'wb')
+        archivos[f"{nombre}.valores"].write(valores.tobytes())
+        columna.update(tipo='numero', dtype=valores.dtype.str)
+
+    # Meta del snapshot si existe y no vencio (los vencidos se borran)
+    def meta(self, clave):
+        path = self._path(clave, 'meta.json')
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            meta = json.load(f)
+        if self.ttl is not None and time.time() - meta['creado'] > self.ttl:
+            shutil.rmtree(self._path(clave), ignore_errors=True)
+            return None
+        return meta
+
+    # DataFrame con las columnas pedidas (todas si columnas es None) o None si no hay snapshot.
+    # Los numeros y fechas quedan sobre el archivo mapeado en memoria, sin copiarse.
+    # Las columnas de texto en solo_nulos no se decodifican: vienen como booleano nullable
+    # (True si hay texto, NA si es nulo) armado solo con su mascara de nulos, que alcanza
+    # para contar comentarios (count, notna)
+    def cargar(self, clave, columnas=None, solo_nulos=()):
+        meta = self.meta(clave)
+        if meta is None:
+            return None
+        # La fecha de modificacion del meta marca el ultimo uso (para desalojar por LRU)
+        os.utime(self._path(clave, 'meta.json'))
+        filas = meta['filas']
+        datos = {}
+        for nombre in columnas or list(meta['columnas']):
+            datos[nombre] = self._leer_columna(clave, nombre, meta['columnas'][nombre], filas, nombre in solo_nulos)
+        return pd.DataFrame(datos, copy=False) if datos else pd.DataFrame(index=range(filas))
+
+    def _leer_columna(self, clave, nombre, columna, filas, solo_nulos=False):
+        def mapear(sufijo, dtype, cantidad=filas):
+            if cantidad == 0:
+                return np.empty(0, dtype=dtype)
+            return np.memmap(self._path(clave, f"{nombre}.{sufijo}"), dtype=dtype, mode='r', shape=(cantidad,))
+
+        tipo = columna['tipo']
+        if tipo == 'categoria':
+            return pd.Categorical.from_codes(mapear('codigos', 'int16'), columna['categorias'])
+        if tipo == 'fecha':
+            return pd.Series(mapear('valores', 'int64').view('datetime64[ns]'), copy=False)
+        if tipo == 'entero':
+            return pd.arrays.IntegerArray(mapear('valores', columna['dtype']), mapear('nulos', 'bool'))
+        if tipo == 'numero':
+            # Los float ya tienen NaN en los nulos; los booleanos con nulos van a BooleanArray
+            valores = mapear('valores', columna['dtype'])
+            if columna['dtype'] == '|b1':
+                nulos = mapear('nulos', 'bool')
+                return pd.arrays.BooleanArray(valores, nulos) if nulos.any() else valores
+            return valores
+        nulos = mapear('nulos', 'bool')
+        if solo_nulos:
+            return pd.arrays.BooleanArray(~nulos, np.asarray(nulos))
+        # Los offsets se pasan a enteros de Python una vez (indexar el memmap fila a fila es lento)
+        offsets = mapear('offsets', 'int64', filas + 1).tolist()
+        datos = bytes(mapear('datos', 'uint8', columna.get('bytes', 0)))
+        return np.array([None if nulo else datos[inicio:fin].decode('utf-8')
+                         for nulo, inicio, fin in zip(nulos.tolist(), offsets, offsets[1:])], dtype=object)
+
+    def tamano(self, clave):
+        directorio = self._path(clave)
+        return sum(os.path.getsize(os.path.join(directorio, archivo)) for archivo in os.listdir(directorio))
+
+    # Borra los snapshots menos usados hasta que el total entre en max_bytes
+    def desalojar(self, conservar=None):
+        snapshots = []
+        for clave in os.listdir(self.directorio):
+            meta = self._path(clave, 'meta.json')
+            if os.path.exists(meta):
+                snapshots.append((os.path.getmtime(meta), clave, self.tamano(clave)))
+        total = sum(tamano for _, _, tamano in snapshots)
+        for _, clave, tamano in sorted(snapshots):
+            if total <= self.max_bytes:
+                break
+            if clave != conservar:
+                shutil.rmtree(self._path(clave), ignore_errors=True)
+                total -= tamano
+
+# Los lotes tal cual; si la consulta no trae filas, un lote vacio con las columnas tipadas
+# (asi el snapshot de una tabla vacia tiene todas sus columnas)
+def _con_columnas(chunks, columnas):
+    vacio = True
+    for chunk in chunks:
+        vacio = False
+        yield chunk
+    if vacio:
+        yield tipar_chunk(pd.DataFrame(columns=columnas))
+
+# Identifica la base de datos de origen (sin la contraseña) para la clave del snapshot
+def fuente_config(config=None):
+    config = config or cargar_config()
+    return f"{config['driver']}://{config['user'] or ''}@{config['host']}:{config['port']}/{config['database']}"
+
+# Tabla de la encuesta desde el snapshot local; si no hay (o vencio, o refrescar=True)
+# se consulta la base una sola vez y se guarda. Devuelve None si no hay snapshot ni conexion.
+# columnas define el snapshot; cargar (un subconjunto) y solo_nulos eligen que se lee de el
+def obtener_dataset(cache, columnas=COLUMNAS_METRICAS, filtro=None, params=(), tabla=TABLA, refrescar=False, config=None,
+                    cargar=None, solo_nulos=()):
+    query = f"SELECT {', '.join(columnas)} FROM {tabla}" + (f" WHERE {filtro}" if filtro else "")
+    clave = cache.clave(fuente_config(config), query, params)
+    if not refrescar:
+        with instrumentacion.etapa('cargar_snapshot'):
+            data = cache.cargar(clave, cargar, solo_nulos)
+        if data is not None:
+            logger.info(f"Snapshot '{clave}' cargado: {len(data)} filas", extra={'datos': {'snapshot': clave, 'filas': len(data)}})
+            return data
+    conn, cursor = connectDB(config)
+    if not (conn and cursor):
+        return None
+    try:
+        with instrumentacion.etapa('guardar_snapshot'):
+            chunks = fetch_data_chunks(cursor, CHUNK_SIZE, columnas, filtro, params, tabla=tabla)
+            meta = cache.guardar(clave, _con_columnas(chunks, columnas), query=query)
+    finally:
+        cursor.close()
+        conn.close()
+    logger.info(f"Snapshot '{clave}' guardado: {meta['filas']} filas", extra={'datos': {'snapshot': clave, 'filas': meta['filas']}})
+    return cache.cargar(clave, cargar, solo_nulos)
@@ -0,0 +1,21 @@
+import pytest
+
+from encuesta.conexion import CONFIG_DEFAULT, CursorMedido, PoolConexiones
+from encuesta.sinteticos import crear_encuesta_sintetica
+
+# Encuesta sintetica chica en SQLite (90 dias desde 2024-01-01, 4 proyectos)
+@pytest.fixture(scope='session')
+def base(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('db') / 'encuesta.db')
+    # Lotes chicos para que el backend pandas combine varios parciales
+    crear_encuesta_sintetica(3000, path, chunk_size=700, proyectos=4, dias=90)
+    return path
+
+@pytest.fixture(scope='session')
+def cursor(base):
+    pool = PoolConexiones(dict(CONFIG_DEFAULT, driver='sqlite', database=base, pool_size=1))
+    conn = pool.obtener()
+    cursor = CursorMedido(conn.cursor(), pool)
+    yield cursor
+    cursor.close()
+    conn.close()
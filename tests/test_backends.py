@@ -0,0 +1,45 @@
+""" Los backends pandas y SQL de metricas y segmentos dan los mismos numeros """
+import pandas as pd
+import pytest
+
+from encuesta.metricas import calcular_metricas_incremental, metricas_pandas, metricas_sql
+from encuesta.segmentos import segmentos_pandas, segmentos_sql
+
+# El tiempo entre respuestas necesita las filas ordenadas: el backend SQL no lo calcula
+SOLO_PANDAS = {'tiempo_entre_respuestas'}
+
+FILTROS = [
+    (None, ()),
+    ("proyecto = %s", ('Proyecto 002',)),
+    ("fecha >= %s AND fecha < %s", ('2024-02-01 00:00:00', '2024-03-01 00:00:00')),
+]
+
+@pytest.mark.parametrize('filtro, params', FILTROS)
+def test_metricas_iguales(cursor, filtro, params):
+    esperado = metricas_pandas(cursor, filtro, params, chunk_size=500).result()
+    obtenido = metricas_sql(cursor, filtro, params).result()
+    assert esperado['total_respuestas'] > 0
+    for clave in set(esperado) - SOLO_PANDAS:
+        assert obtenido[clave] == esperado[clave], clave
+
+@pytest.mark.parametrize('filtro, params', FILTROS)
+@pytest.mark.parametrize('dimensiones, periodo', [(('proyecto',), None), (('proyecto', 'canal'), 'mes'), ((), 'semana'), ((), 'dia')])
+def test_segmentos_iguales(cursor, filtro, params, dimensiones, periodo):
+    esperado = segmentos_pandas(cursor, dimensiones, periodo, filtro, params, chunk_size=500)
+    obtenido = segmentos_sql(cursor, dimensiones, periodo, filtro, params)
+    assert len(esperado) > 0
+    pd.testing.assert_frame_equal(obtenido, esperado, check_dtype=False)
+
+# Un estado incremental que suma una corrida SQL ya no tiene los tiempos de todas las filas
+@pytest.mark.parametrize('backend, tiempos', [('pandas', True), ('sql', False)])
+def test_incremental_mezclando_backends(cursor, tmp_path, backend, tiempos):
+    estado = str(tmp_path / 'estado.json')
+    calcular_metricas_incremental(cursor, estado, 'pandas', "id <= %s", (2000,))
+    resultado = calcular_metricas_incremental(cursor, estado, backend)
+    assert resultado['total_respuestas'] == metricas_sql(cursor).total
+    if tiempos:
+        assert resultado['tiempo_entre_respuestas']['cantidad'] == resultado['total_respuestas'] - 1
+    else:
+        assert resultado['tiempo_entre_respuestas'] is None
+        # Y sigue asi en las corridas siguientes, aunque sean con pandas
+        assert calcular_metricas_incremental(cursor, estado, 'pandas')['tiempo_entre_respuestas'] is None
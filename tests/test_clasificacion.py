@@ -0,0 +1,72 @@
+""" Clasificacion de los comentarios """
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from encuesta.clasificacion import ClasificadorLexico, ClasificadorLLM, clasificar_comentarios
+
+@pytest.mark.parametrize('texto, sentiment, problems', [
+    # Problemas solo al comienzo de una palabra
+    ("Excelente servicio, sin problemas", 'Positivo', []),
+    ("Consulta por el contrato, hay que confirmar la fecha", 'Neutro', []),
+    ("Se apagó la luz del pasillo", 'Neutro', []),
+    ("Muy lenta la postventa", 'Negativo', ['Servicio de postventa', 'Demoras en respuestas']),
+    ("Problemas con la firma y el pago", 'Negativo', ['Proceso de compra y financiamiento']),
+    # La negacion invierte una sola palabra con sentimiento, positiva o negativa
+    ("Sin reclamos, todo bien", 'Positivo', []),
+    ("No es malo", 'Positivo', []),
+    ("No cumplen, mala atención", 'Negativo', ['Atención al cliente']),
+    ("Poco amable el vendedor", 'Negativo', ['Atención al cliente']),
+])
+def test_lexico(texto, sentiment, problems):
+    assert ClasificadorLexico().clasificar(texto) == {'sentiment': sentiment, 'problems': problems}
+
+# Servidor local con la API de chat completions: guarda los textos de cada pedido
+@pytest.fixture
+def servidor_llm():
+    pedidos = []
+
+    class Manejador(BaseHTTPRequestHandler):
+        def do_POST(self):
+            cuerpo = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            textos = [linea.split('. ', 1)[1] for linea in cuerpo['messages'][1]['content'].split('\n')]
+            pedidos.append(textos)
+            resultados = [{'sentiment': 'Negativo', 'problems': [f"Problema {texto}"]} for texto in textos]
+            respuesta = json.dumps({'choices': [{'message': {'content': json.dumps({'resultados': resultados})}}]}).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(respuesta)))
+            self.end_headers()
+            self.wfile.write(respuesta)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), Manejador)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    yield f"http://127.0.0.1:{servidor.server_port}/v1/chat/completions", pedidos
+    servidor.shutdown()
+    servidor.server_close()
+
+# Lotes de tamano_lote y, en la segunda corrida, solo los textos que no estaban en la cache
+def test_llm_por_lotes_y_cache(servidor_llm, tmp_path):
+    url, pedidos = servidor_llm
+    clasificador = ClasificadorLLM(url=url, modelo='falso', api_key='clave')
+    cache_path = str(tmp_path / 'cache.sqlite')
+    comentarios = [{'id': indice, 'recomendacion': 5, 'comment': f"comentario {indice}"} for indice in range(7)]
+    # Un texto repetido se envia una sola vez
+    comentarios.append(dict(comentarios[0], id=7))
+
+    clasificados = clasificar_comentarios(comentarios, clasificador, cache_path, tamano_lote=3, concurrencia=2)
+    assert sorted(len(textos) for textos in pedidos) == [1, 3, 3]
+    assert sorted(texto for textos in pedidos for texto in textos) == sorted({comentario['comment'] for comentario in comentarios})
+    assert [clasificado['problems'] for clasificado in clasificados] == [[f"Problema {comentario['comment']}"] for comentario in comentarios]
+
+    pedidos.clear()
+    nuevos = [{'id': 10, 'recomendacion': 3, 'comment': 'comentario nuevo'}, {'id': 11, 'recomendacion': 2, 'comment': 'otro nuevo'}]
+    clasificados = clasificar_comentarios(comentarios + nuevos, clasificador, cache_path, tamano_lote=3)
+    assert pedidos == [['comentario nuevo', 'otro nuevo']]
+    assert len(clasificados) == len(comentarios) + 2 and clasificados[-1]['problems'] == ['Problema otro nuevo']
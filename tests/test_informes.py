@@ -0,0 +1,43 @@
+""" Los graficos y los PDF se arman aunque no haya datos """
+import io
+
+import pandas as pd
+import pytest
+
+from encuesta.datos import filtro_ventana, tipar_chunk, ventana_fechas
+from encuesta.graficos import crear_graficos
+from encuesta.informes import create_pdf, generar_informe_completo, generar_informe_metricas
+from encuesta.metricas import BACKENDS_METRICAS, calcular_metricas
+
+# Una ventana de fechas sin respuestas es una entrada normal
+@pytest.mark.parametrize('backend', sorted(BACKENDS_METRICAS))
+def test_ventana_vacia(cursor, backend):
+    filtro, params = filtro_ventana(ventana_fechas('2030-01-01'))
+    resultado = BACKENDS_METRICAS[backend](cursor, filtro, params).result()
+    assert resultado['total_respuestas'] == 0
+    assert resultado['promedio_recomendacion'] is None
+    crear_graficos(resultado, io.BytesIO())
+    pdf = generar_informe_completo(resultado, [], io.BytesIO())
+    assert pdf.page_no() == 1
+
+# Respuestas sin nota de recomendacion: el promedio no se puede calcular
+def test_recomendacion_nula():
+    chunk = tipar_chunk(pd.DataFrame({
+        'satisfeccion_general': [5, 7], 'recomendacion': [None, None], 'conocia_empresa': ['Sí', 'No'],
+        'recomendacion_abierta': [None, 'Bien'], 'fecha': ['2024-01-01 10:00:00', '2024-01-02 10:00:00'],
+    }))
+    resultado = calcular_metricas([chunk])
+    assert resultado['promedio_recomendacion'] is None
+    generar_informe_metricas(resultado, io.BytesIO())
+
+@pytest.mark.parametrize('modo', ['completo', 'resumen'])
+def test_sin_comentarios(modo):
+    pdf = create_pdf([], io.BytesIO(), modo)
+    assert pdf.page_no() >= 1
+
+# Las etiquetas de los problemas (ej. las de un LLM) pueden traer caracteres fuera de latin-1
+@pytest.mark.parametrize('modo', ['completo', 'resumen'])
+def test_problemas_fuera_de_latin1(modo):
+    comments = [{'comment': 'No “responden” — nunca', 'sentiment': 'Negativo', 'problems': ['Falta de “respuesta” — postventa'],
+                 'recomendacion': 2}]
+    create_pdf(comments, io.BytesIO(), modo)
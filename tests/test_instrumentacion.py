@@ -0,0 +1,17 @@
+""" Informe de ejecucion """
+import json
+import sys
+
+from encuesta.instrumentacion import Instrumentacion
+
+# Sin el modulo resource (Windows) el paquete se importa igual y la memoria pico queda en None
+def test_sin_resource(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, 'resource', None)
+    instrumentacion = Instrumentacion()
+    instrumentacion.activar()
+    with instrumentacion.etapa('prueba'):
+        instrumentacion.contar('filas_leidas', 3)
+    instrumentacion.guardar_informe(str(tmp_path / 'informe.json'))
+    with open(tmp_path / 'informe.json', encoding='utf-8') as f:
+        assert json.load(f)['rss_pico_mb'] is None
+    assert (tmp_path / 'informe.prom').read_text().endswith('# EOF\n')
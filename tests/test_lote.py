@@ -0,0 +1,29 @@
+""" Informes por lote: cada fuente con sus propios archivos """
+import os
+
+import pytest
+
+from encuesta import conexion
+from encuesta.lote import generar_informes_lote
+
+@pytest.fixture
+def entorno(base, monkeypatch):
+    monkeypatch.setenv('ENCUESTA_DB_DRIVER', 'sqlite')
+    monkeypatch.setenv('ENCUESTA_DB_DATABASE', base)
+    monkeypatch.setattr(conexion, '_pool', None)
+
+# Nombres que quedan iguales al limpiarlos para el archivo
+def test_nombres_que_chocan(entorno, tmp_path):
+    fuentes = [{'nombre': 'Norte/Sur', 'filtro': "proyecto = %s", 'params': ['Proyecto 001']},
+               {'nombre': 'Norte Sur', 'filtro': "proyecto = %s", 'params': ['Proyecto 002']}]
+    resumen = generar_informes_lote(fuentes, str(tmp_path), workers=2, incremental=True)
+    assert resumen['ok'] == 2
+    pdfs = {job['pdf'] for job in resumen['jobs']}
+    assert len(pdfs) == 2 and all(os.path.exists(pdf) for pdf in pdfs)
+    assert len([archivo for archivo in os.listdir(tmp_path) if archivo.startswith('estado_')]) == 2
+
+def test_fuentes_repetidas(tmp_path):
+    fuente = {'nombre': 'Norte', 'filtro': "proyecto = %s", 'params': ['Proyecto 001']}
+    with pytest.raises(ValueError, match='repetidas'):
+        generar_informes_lote([fuente, dict(fuente)], str(tmp_path))
+    assert not os.listdir(tmp_path)
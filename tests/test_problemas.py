@@ -0,0 +1,36 @@
+""" Agrupacion de etiquetas de problemas en categorias """
+import random
+import re
+
+from encuesta.ejemplos import COMENTARIOS_EJEMPLO
+from encuesta.problemas import IndiceProblemas, agregar_problemas
+
+def _comentario(*problemas):
+    return {'comment': '', 'sentiment': 'Negativo', 'problems': list(problemas), 'recomendacion': 2}
+
+# La categoria toma el nombre de la etiqueta mas frecuente, llegue primero o no
+def test_nombre_de_la_etiqueta_mas_frecuente():
+    comentarios = [_comentario('Malas terminaciones de los departamentos')] + [_comentario('Malas terminaciones')] * 3
+    assert agregar_problemas(comentarios)['total'] == [('Malas terminaciones', 4)]
+
+def test_no_depende_del_orden():
+    esperado = agregar_problemas(COMENTARIOS_EJEMPLO)
+    for semilla in range(5):
+        comentarios = list(COMENTARIOS_EJEMPLO)
+        random.Random(semilla).shuffle(comentarios)
+        assert agregar_problemas(comentarios) == esperado
+
+# Etiquetas armadas con palabras de las etiquetas de ejemplo: casi todas distintas y parecidas entre si.
+# Cada etiqueta nueva se compara con una fraccion chica de las categorias (no con todas las que
+# comparten un trigrama), asi el costo crece casi lineal con la cantidad de comentarios
+def test_escala():
+    palabras = sorted({palabra for comentario in COMENTARIOS_EJEMPLO for problema in comentario['problems']
+                       for palabra in re.findall(r'\w+', problema)})
+    azar = random.Random(0)
+    comentarios = [_comentario(*(' '.join(azar.sample(palabras, azar.randint(2, 4))) for _ in range(azar.randint(1, 3))))
+                   for _ in range(4000)]
+    indice = IndiceProblemas()
+    agregar_problemas(comentarios, indice)
+    etiquetas = len(indice._resueltas)
+    assert etiquetas > 5000 and len(indice.categorias) > 1500
+    assert indice.comparaciones / etiquetas < 0.01 * len(indice.categorias)
@@ -0,0 +1,69 @@
+""" Cache de resultados del servicio HTTP """
+import shutil
+
+import pytest
+
+from encuesta import conexion, pipeline
+from encuesta.conexion import CONFIG_DEFAULT, ErrorConexion, PoolConexiones
+from encuesta.servicio import ServicioEncuesta
+
+# Pool del proceso apuntando a una copia de la base (el test agrega filas)
+@pytest.fixture
+def pool(base, tmp_path, monkeypatch):
+    path = str(tmp_path / 'encuesta.db')
+    shutil.copy(base, path)
+    pool = PoolConexiones(dict(CONFIG_DEFAULT, driver='sqlite', database=path, pool_size=2))
+    monkeypatch.setattr(conexion, '_pool', pool)
+    return pool
+
+def _consultas_marca(pool):
+    return sum(estadistica['llamadas'] for query, estadistica in pool.estadisticas.items() if query.startswith('SELECT MAX(id), MAX(fecha)'))
+
+def test_cache_y_marca_de_agua(pool):
+    servicio = ServicioEncuesta(intervalo_marca=0)
+    _, primero, origen = servicio.responder('/metricas', 'backend=sql')
+    assert origen == 'calculado'
+    _, segundo, origen = servicio.responder('/metricas', 'backend=sql&segmento=proyecto&valor=Proyecto 001')
+    assert origen == 'calculado'
+    assert servicio.responder('/metricas', 'backend=sql')[1:] == (primero, 'cache')
+
+    # Una fila nueva cambia la marca de agua y el resultado se vuelve a calcular
+    conn = pool.obtener()
+    conn.execute("INSERT INTO encuesta (satisfeccion_general, recomendacion, conocia_empresa, fecha, proyecto) "
+                 "VALUES (7, 7, 'Sí', '2024-12-31 10:00:00', 'Proyecto 001')")
+    conn.commit()
+    conn.close()
+    _, tercero, origen = servicio.responder('/metricas', 'backend=sql')
+    assert origen == 'calculado' and tercero != primero
+
+# La marca de agua se consulta a lo sumo una vez por intervalo, la compartan o no los pedidos
+def test_marca_de_agua_por_intervalo(pool):
+    servicio = ServicioEncuesta(intervalo_marca=60)
+    for valor in ('Proyecto 001', 'Proyecto 002', 'Proyecto 001'):
+        servicio.responder('/metricas', f"backend=sql&segmento=proyecto&valor={valor}")
+    assert _consultas_marca(pool) == 1
+
+# Sin conexion para los comentarios el informe falla (503), no sale con los de ejemplo ni queda en la cache
+def test_informe_sin_conexion_para_comentarios(pool, monkeypatch):
+    servicio = ServicioEncuesta(intervalo_marca=60)
+    conexiones = []
+    # La primera conexion (la de las metricas) funciona, la de los comentarios no
+    def conectar(config=None):
+        conexiones.append(config)
+        return conexion.connectDB(config) if len(conexiones) == 1 else (None, None)
+    with monkeypatch.context() as parche:
+        parche.setattr(pipeline, 'connectDB', conectar)
+        with pytest.raises(ErrorConexion):
+            servicio.responder('/informe.pdf', 'backend=sql')
+    assert len(conexiones) == 2
+    assert servicio.responder('/informe.pdf', 'backend=sql')[2] == 'calculado'
+
+# /estadisticas serializa una copia: los hilos que atienden pedidos siguen registrando consultas
+def test_estadisticas_es_una_copia(pool):
+    servicio = ServicioEncuesta()
+    servicio.responder('/metricas', 'backend=sql')
+    consultas = servicio.estadisticas()['consultas']
+    assert consultas == pool.estadisticas
+    pool.registrar_query("SELECT 1", 0.0, 1)
+    assert "SELECT 1" not in consultas
+    assert all(consultas[query] is not pool.estadisticas[query] for query in consultas)
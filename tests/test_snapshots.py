@@ -0,0 +1,58 @@
+""" Snapshots locales: mismas metricas y comentarios que la base """
+import os
+
+import pandas as pd
+import pytest
+
+from encuesta import conexion
+from encuesta.clasificacion import extraer_comentarios, leer_comentarios
+from encuesta.datos import filtrar_ventana, lotes, ventana_fechas
+from encuesta.metricas import calcular_metricas, metricas_pandas
+from encuesta.pipeline import cargar_dataset
+from encuesta.segmentos import agrupar_segmentos, segmentos_pandas
+from encuesta.sinteticos import crear_encuesta_sintetica
+from encuesta.snapshots import CacheSnapshots
+
+@pytest.fixture
+def cache(base, tmp_path, monkeypatch):
+    monkeypatch.setenv('ENCUESTA_DB_DRIVER', 'sqlite')
+    monkeypatch.setenv('ENCUESTA_DB_DATABASE', base)
+    monkeypatch.setattr(conexion, '_pool', None)
+    return CacheSnapshots(str(tmp_path / 'snapshots'))
+
+def test_metricas_sin_decodificar_textos(cache, cursor):
+    dataset = cargar_dataset(cache, ['proyecto'])
+    # El texto de los comentarios no se lee: alcanza con la mascara de nulos
+    for clave in os.listdir(cache.directorio):
+        os.remove(os.path.join(cache.directorio, clave, 'recomendacion_abierta.datos'))
+    dataset = cargar_dataset(cache, ['proyecto'])
+    esperado = metricas_pandas(cursor).result()
+    obtenido = calcular_metricas(lotes(dataset))
+    assert obtenido == esperado
+    assert agrupar_segmentos(lotes(dataset), ['proyecto']).equals(segmentos_pandas(cursor, ['proyecto']))
+
+def test_comentarios(cache, cursor):
+    cargar_dataset(cache, ['proyecto'])
+    dataset = cargar_dataset(cache, ['proyecto'], comentarios=True)
+    assert extraer_comentarios(lotes(dataset)) == leer_comentarios(cursor)
+
+def test_tabla_vacia(tmp_path, monkeypatch):
+    path = str(tmp_path / 'vacia.db')
+    crear_encuesta_sintetica(0, path)
+    monkeypatch.setenv('ENCUESTA_DB_DRIVER', 'sqlite')
+    monkeypatch.setenv('ENCUESTA_DB_DATABASE', path)
+    monkeypatch.setattr(conexion, '_pool', None)
+    cache = CacheSnapshots(str(tmp_path / 'snapshots'))
+    cargar_dataset(cache, ['proyecto'])
+    dataset = cargar_dataset(cache, ['proyecto'])
+    assert len(dataset) == 0 and {'recomendacion', 'fecha', 'proyecto'} <= set(dataset.columns)
+    assert len(filtrar_ventana(dataset, ventana_fechas('2024-01-01'))) == 0
+    assert cargar_dataset(cache, ['proyecto'], comentarios=True).columns.tolist()[:3] == ['recomendacion', 'recomendacion_abierta', 'fecha']
+
+# Un entero sin nulos en el primer lote y con nulos (o decimales) despues
+def test_enteros_con_nulos_en_otro_lote(tmp_path):
+    cache = CacheSnapshots(str(tmp_path))
+    cache.guardar('a', [pd.DataFrame({'x': [1, 2]}), pd.DataFrame({'x': [3, None]})])
+    assert cache.cargar('a')['x'].tolist() == [1, 2, 3, pd.NA]
+    cache.guardar('b', [pd.DataFrame({'x': [1, 2]}), pd.DataFrame({'x': [None, 2.5]})])
+    assert cache.cargar('b')['x'].fillna(-1).tolist() == [1.0, 2.0, -1.0, 2.5]